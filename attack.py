@@ -30,15 +30,47 @@ import time
 import threading
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import pyautogui
 
-from core.clicker import click
-from core.config import load_config
-from core.detector import find_on_screen, wait_for, is_visible
+from core.clicker import click, fast_click
+from core.config import POSITION_SCHEMA, load_config
+from core.detector import find_on_screen, is_visible, locate_bulk, wait_for
 from core.screen import get_screen_size
 
 _IMG_DIR = "img"
 
+# A fresh deployment cannot hit 50% (or wipe) faster than this — the
+# battle-wait loop skips its screenshot polls entirely until then.
+_MIN_BATTLE_SECS = 8.0
+
+# Own RNG instance — the global random module functions share one
+# lock-protected state with every other consumer in the process.
+_RNG = random.Random()
+
+# ---------------------------------------------------------------------------
+#  Deployment layout — flat tuples built once at import
+# ---------------------------------------------------------------------------
+# Key pairs for the 4 deployment edges (each edge = 2 corner position keys).
+_DEPLOY_EDGES: Tuple[Tuple[str, str], ...] = (
+    ("deploy_left_up",     "deploy_left_left"),    # left-top  → left-left
+    ("deploy_left_left",   "deploy_left_bottom"),  # left-left → left-bottom
+    ("deploy_right_up",    "deploy_right_right"),  # right-top → right-right
+    ("deploy_right_right", "deploy_right_bottom"), # right-right → right-bottom
+)
+
+# (label, position key) for the 3 spell drop zones.
+_SPELL_TARGETS: Tuple[Tuple[str, str], ...] = (
+    ("left",   "spell_target_left"),
+    ("center", "spell_target_center"),
+    ("right",  "spell_target_right"),
+)
+
+# (slot key, deploy key) for the 4 hero slots.
+_HERO_KEYS: Tuple[Tuple[int, str, str], ...] = tuple(
+    (n, f"hero_{n}", f"hero_{n}_deploy") for n in range(1, 5)
+)
+
 
 # ---------------------------------------------------------------------------
 #  Helpers
@@ -52,14 +84,26 @@ def _pos(config: Dict[str, Any], key: str) -> Optional[Tuple[int, int]]:
     return None
 
 
+# Paths of templates confirmed on disk — a file that exists stays
+# existing, so positive stat() results are memoized per filename.
+# Misses are NOT cached: the Setup Panel can capture a missing template
+# mid-process (stop → capture → restart), and that must be picked up on
+# the next lookup.
+_TPL_PATHS: Dict[str, str] = {}
+
+
 def _tpl(config: Dict[str, Any], key: str) -> Optional[str]:
     """Return full path to a template image, or ``None``."""
     fname = config["templates"].get(key)
-    if fname:
+    if not fname:
+        return None
+    path = _TPL_PATHS.get(fname)
+    if path is None:
         path = os.path.join(_IMG_DIR, fname)
-        if os.path.isfile(path):
-            return path
-    return None
+        if not os.path.isfile(path):
+            return None
+        _TPL_PATHS[fname] = path
+    return path
 
 
 def _interpolate_positions(
@@ -74,13 +118,10 @@ def _interpolate_positions(
         mx = (p1[0] + p2[0]) // 2
         my = (p1[1] + p2[1]) // 2
         return [(mx, my)]
-    points = []
-    for i in range(count):
-        t = i / (count - 1)
-        x = int(p1[0] + t * (p2[0] - p1[0]))
-        y = int(p1[1] + t * (p2[1] - p1[1]))
-        points.append((x, y))
-    return points
+    # linspace generates both coordinate columns in a single C pass
+    # instead of a Python loop with per-point arithmetic.
+    points = np.linspace(p1, p2, count).astype(int)
+    return [(int(x), int(y)) for x, y in points]
 
 
 # ---------------------------------------------------------------------------
@@ -93,9 +134,10 @@ def zoom_out(log: Callable) -> None:
     cx, cy = sw // 2, sh // 2
     pyautogui.moveTo(cx, cy, duration=0.15)
     time.sleep(0.2)
-    for _ in range(5):
-        pyautogui.scroll(-3)
-        time.sleep(0.15)
+    # One large wheel delta instead of five small steps — the emulator
+    # coalesces it into a single zoom gesture and we skip the per-step
+    # sleeps (and pyautogui PAUSEs) of the old loop.
+    pyautogui.scroll(-15)
     log("Zoomed out")
     time.sleep(0.3)
 
@@ -120,8 +162,21 @@ def run_single_attack(
         return stop_event.is_set()
 
     def _honour_pause() -> None:
-        while pause_event.is_set() and not stop_event.is_set():
-            time.sleep(0.2)
+        # stop_event.wait blocks on a condition variable and returns the
+        # instant Stop is pressed, instead of oversleeping a fixed tick.
+        while pause_event.is_set():
+            if stop_event.wait(0.2):
+                return
+
+    # Resolve every configured position ONCE up front — the button layout
+    # cannot change mid-attack, so later phases reuse this dict instead of
+    # re-reading the config per key (heroes alone are looked up in both
+    # the deploy and ability phases).
+    pos = {
+        key: _pos(config, key)
+        for group in POSITION_SCHEMA.values()
+        for key in group
+    }
 
     # ── Zoom out ──────────────────────────────────────────────────────
     zoom_out(log)
@@ -129,7 +184,7 @@ def run_single_attack(
         return False
 
     # ── 1. Click Attack menu ──────────────────────────────────────────
-    attack_menu = _pos(config, "attack_menu")
+    attack_menu = pos["attack_menu"]
     if not attack_menu:
         log("✗ attack_menu position missing")
         return False
@@ -142,7 +197,7 @@ def run_single_attack(
         return False
 
     # ── 2. Find a Match ───────────────────────────────────────────────
-    find_match = _pos(config, "find_match")
+    find_match = pos["find_match"]
     if not find_match:
         log("✗ find_match position missing")
         return False
@@ -155,28 +210,41 @@ def run_single_attack(
         return False
 
     # ── 3. Confirm attack ─────────────────────────────────────────────
-    confirm = _pos(config, "confirm_attack")
+    confirm = pos["confirm_attack"]
     if not confirm:
         log("✗ confirm_attack position missing")
         return False
 
     log("Confirming attack...")
     click(*confirm)
-    time.sleep(3.0)  # wait for battle to load
+
+    # The Next button appears once a base is on screen — poll for it
+    # through the in-process matching pipeline instead of sleeping a
+    # fixed 3 s and hoping the battle has loaded.
+    next_tpl = _tpl(config, "next_button")
+    if next_tpl:
+        if wait_for(
+            next_tpl,
+            timeout=15.0,
+            interval=0.5,
+            confidence=0.85,
+            stop_event=stop_event,
+        ):
+            log("Base found")
+        time.sleep(0.5)  # let the scene settle before deploying
+    else:
+        time.sleep(3.0)  # no template — fall back to a fixed load wait
     _honour_pause()
     if _check_stop():
         return False
 
     # ── 4. Deploy spells ──────────────────────────────────────────────
-    spell_slot = _pos(config, "spell")
+    spell_slot = pos["spell"]
     spell_targets = [
-        ("left",   _pos(config, "spell_target_left")),
-        ("center", _pos(config, "spell_target_center")),
-        ("right",  _pos(config, "spell_target_right")),
+        (name, pos[key]) for name, key in _SPELL_TARGETS if pos[key]
     ]
-    spell_targets = [(name, pos) for name, pos in spell_targets if pos]
     spell_count = config.get("settings", {}).get("spell_count", 11)
-    siege_deploy = _pos(config, "siege_deploy")
+    siege_deploy = pos["siege_deploy"]
 
     if spell_slot and spell_targets and spell_count > 0:
         num_targets = len(spell_targets)
@@ -184,8 +252,8 @@ def run_single_attack(
         # Sort targets by distance to siege deploy (closest last = gets remainder)
         if siege_deploy:
             def _dist(t):
-                pos = t[1]
-                return math.hypot(pos[0] - siege_deploy[0], pos[1] - siege_deploy[1])
+                p = t[1]
+                return math.hypot(p[0] - siege_deploy[0], p[1] - siege_deploy[1])
             spell_targets.sort(key=_dist, reverse=True)  # farthest first
             # Now closest to siege is last — it gets the smaller share
             # We want closest to get MORE, so: closest first for remainder
@@ -196,16 +264,16 @@ def run_single_attack(
         base = spell_count // num_targets
         remainder = spell_count % num_targets
         distribution = []
-        for i, (name, pos) in enumerate(spell_targets):
+        for i, (name, target) in enumerate(spell_targets):
             count = base + (1 if i < remainder else 0)
-            distribution.append((name, pos, count))
+            distribution.append((name, target, count))
 
         log(f"Deploying {spell_count} spells: {', '.join(f'{c}×{n}' for n, _, c in distribution)}")
         click(*spell_slot)
         time.sleep(0.3)
-        for name, pos, count in distribution:
+        for name, target, count in distribution:
             for _ in range(count):
-                click(*pos, duration=0.02, delay=0.08)
+                click(*target, duration=0.02, delay=0.08)
             time.sleep(0.15)
         time.sleep(0.3)
     _honour_pause()
@@ -213,7 +281,7 @@ def run_single_attack(
         return False
 
     # ── 5. Deploy siege ───────────────────────────────────────────────
-    siege_slot = _pos(config, "siege")
+    siege_slot = pos["siege"]
 
     if siege_slot and siege_deploy:
         log("Deploying siege machine...")
@@ -226,20 +294,12 @@ def run_single_attack(
         return False
 
     # ── 6. Deploy troops ──────────────────────────────────────────────
-    troop_slot = _pos(config, "troop")
+    troop_slot = pos["troop"]
     troop_count = config.get("settings", {}).get("troop_count", 40)
 
-    # Gather the 4 deployment edges (each edge = 2 corner points)
-    edges = [
-        ("deploy_left_up",     "deploy_left_left"),    # left-top  → left-left
-        ("deploy_left_left",   "deploy_left_bottom"),  # left-left → left-bottom
-        ("deploy_right_up",    "deploy_right_right"),  # right-top → right-right
-        ("deploy_right_right", "deploy_right_bottom"), # right-right → right-bottom
-    ]
-
     edge_pairs: List[Tuple[Tuple[int, int], Tuple[int, int]]] = []
-    for k1, k2 in edges:
-        p1, p2 = _pos(config, k1), _pos(config, k2)
+    for k1, k2 in _DEPLOY_EDGES:
+        p1, p2 = pos[k1], pos[k2]
         if p1 and p2:
             edge_pairs.append((p1, p2))
 
@@ -248,21 +308,24 @@ def run_single_attack(
         base_per_side = troop_count // num_sides
         remainder = troop_count % num_sides
 
-        log(f"Deploying {troop_count} troops across {num_sides} sides...")
-        click(*troop_slot)
-        time.sleep(0.3)
-
+        # Precompute every drop point up front so the click burst below
+        # is pure I/O with no interleaved arithmetic.
+        deploy_points: List[Tuple[int, int]] = []
         for i, (p1, p2) in enumerate(edge_pairs):
             # Distribute remainder across first few sides
             side_count = base_per_side + (1 if i < remainder else 0)
-            if side_count <= 0:
-                continue
+            if side_count > 0:
+                deploy_points.extend(_interpolate_positions(p1, p2, side_count))
 
-            positions = _interpolate_positions(p1, p2, side_count)
-            for px, py in positions:
-                if _check_stop():
-                    return False
-                click(px, py, duration=0.02, delay=0.03)
+        log(f"Deploying {troop_count} troops across {num_sides} sides...")
+        click(*troop_slot)
+        time.sleep(0.3)
+
+        for px, py in deploy_points:
+            if _check_stop():
+                return False
+            fast_click(px, py)
+            time.sleep(0.03)
 
         time.sleep(0.3)
         log("Troops deployed")
@@ -271,12 +334,11 @@ def run_single_attack(
         return False
 
     # ── 7. Deploy heroes ──────────────────────────────────────────────
-    hero_slots = []
-    for n in range(1, 5):
-        slot = _pos(config, f"hero_{n}")
-        deploy = _pos(config, f"hero_{n}_deploy")
-        if slot and deploy:
-            hero_slots.append((n, slot, deploy))
+    hero_slots = [
+        (n, pos[slot_key], pos[deploy_key])
+        for n, slot_key, deploy_key in _HERO_KEYS
+        if pos[slot_key] and pos[deploy_key]
+    ]
 
     if hero_slots:
         log(f"Deploying {len(hero_slots)} heroes...")
@@ -304,58 +366,92 @@ def run_single_attack(
 
     # ── 9. Wait for 50 % destruction (90 s timeout) ──────────────────
     fifty_tpl = _tpl(config, "fifty_percent")
+    return_tpl = _tpl(config, "return_home")
     got_fifty = False
+    battle_over = False
 
     if fifty_tpl:
         log("Waiting for 50% destruction (90 s timeout)...")
         start = time.time()
         timeout = 90.0
 
+        # Return Home appearing mid-wait means the battle already ended
+        # (army wiped or base flattened) — watch both templates against
+        # a single screenshot per poll, matched on parallel threads.
+        watch = (fifty_tpl, return_tpl) if return_tpl else (fifty_tpl,)
+        conf = {fifty_tpl: 0.93}
+        if return_tpl:
+            conf[return_tpl] = 0.85
+
         while time.time() - start < timeout:
             if _check_stop():
                 break
             _honour_pause()
-            if is_visible(fifty_tpl, confidence=0.93):
+            if time.time() - start < _MIN_BATTLE_SECS:
+                # Too early for either badge — save the grab + matches.
+                if stop_event.wait(1.0):
+                    break
+                continue
+            hits = locate_bulk(watch, confidence=conf)
+            if hits[fifty_tpl]:
                 got_fifty = True
                 elapsed = time.time() - start
-                wait = random.uniform(5.0, 10.0)
+                wait = _RNG.uniform(5.0, 10.0)
                 log(f"✓ 50% detected after {elapsed:.0f}s — waiting {wait:.1f}s...")
-                time.sleep(wait)
+                stop_event.wait(wait)
+                break
+            if return_tpl and hits[return_tpl]:
+                battle_over = True
+                elapsed = time.time() - start
+                log(f"Battle ended on its own after {elapsed:.0f}s")
+                break
+            if stop_event.wait(1.0):
                 break
-            time.sleep(1.0)
 
-        if not got_fifty and not _check_stop():
+        if not got_fifty and not battle_over and not _check_stop():
             elapsed = time.time() - start
             log(f"✗ 50% not reached after {elapsed:.0f}s — surrendering")
     else:
         log("⚠ No 50% template — waiting 30 s then surrendering")
-        time.sleep(30.0)
+        stop_event.wait(30.0)
 
     if _check_stop():
         return got_fifty
 
     # ── 10. Surrender → OK ────────────────────────────────────────────
-    surrender = _pos(config, "surrender")
-    confirm_ok = _pos(config, "confirm_ok")
-
-    if surrender:
+    # The post-50% grace wait can outlive the battle too — re-check
+    # before blindly clicking where Surrender used to be.
+    if not battle_over and return_tpl and is_visible(return_tpl, confidence=0.85):
+        battle_over = True
+        log("Battle already over — skipping surrender")
+
+    surrender = pos["surrender"]
+    confirm_ok = pos["confirm_ok"]
+
+    if battle_over:
+        pass
+    elif surrender:
         log("Surrendering...")
         click(*surrender)
         time.sleep(1.0)
 
-    if confirm_ok:
+    if confirm_ok and not battle_over:
         log("Clicking OK...")
         click(*confirm_ok)
         time.sleep(2.0)
 
     # ── 11. Return Home ───────────────────────────────────────────────
-    return_tpl = _tpl(config, "return_home")
-
     if return_tpl:
         log("Waiting for Return Home button...")
-        pos = wait_for(return_tpl, timeout=30.0, interval=1.0, confidence=0.85)
-        if pos:
-            click(*pos)
+        home_pos = wait_for(
+            return_tpl,
+            timeout=30.0,
+            interval=1.0,
+            confidence=0.85,
+            stop_event=stop_event,
+        )
+        if home_pos:
+            click(*home_pos)
             log("Returning home...")
             time.sleep(3.0)
         else:
@@ -396,9 +492,10 @@ def run_attacks(
         if stop_event.is_set():
             break
 
-        # Honour pause
-        while pause_event.is_set() and not stop_event.is_set():
-            time.sleep(0.2)
+        # Honour pause — wait on the stop event so Stop interrupts it.
+        while pause_event.is_set():
+            if stop_event.wait(0.2):
+                break
 
         if stop_event.is_set():
             break
@@ -421,7 +518,8 @@ def run_attacks(
         if stop_event.is_set():
             break
 
-        # Brief pause between attacks
-        time.sleep(2.0)
+        # Brief pause between attacks, cut short by Stop.
+        if stop_event.wait(2.0):
+            break
 
     log("All attacks completed." if not stop_event.is_set() else "Bot stopped.")
@@ -0,0 +1,104 @@
+"""
+core/_input_fast.py
+
+Pre-compiled raw input primitives for hot mouse paths.
+
+pyautogui re-resolves its platform backend, tweens the cursor and pays
+``PAUSE`` on every call.  The wall-scroll loop issues a move per drag
+step, so that per-call overhead is paid ``max_scrolls`` times per pass.
+On Windows the functions here go straight to user32; elsewhere they
+fall back to tween-free pyautogui calls (same pattern as
+``clicker.fast_click``).
+
+Everything is resolved once at import time — callers pay only the
+syscall.
+"""
+
+import sys
+import time
+
+import pyautogui
+
+if sys.platform == "win32":
+    import ctypes
+
+    _user32 = ctypes.windll.user32
+    _MOUSEEVENTF_WHEEL = 0x0800
+    _MOUSEEVENTF_LEFTDOWN = 0x0002
+    _MOUSEEVENTF_LEFTUP = 0x0004
+
+    class _MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", ctypes.c_long),
+            ("dy", ctypes.c_long),
+            ("mouseData", ctypes.c_ulong),
+            ("dwFlags", ctypes.c_ulong),
+            ("time", ctypes.c_ulong),
+            ("dwExtraInfo", ctypes.c_size_t),  # ULONG_PTR
+        ]
+
+    class _INPUT(ctypes.Structure):
+        _fields_ = [("type", ctypes.c_ulong), ("mi", _MOUSEINPUT)]
+
+    _INPUT_MOUSE = 0
+
+    def move_to(x: int, y: int) -> None:
+        """Teleport the cursor to *(x, y)* (no tween, no PAUSE)."""
+        _user32.SetCursorPos(int(x), int(y))
+
+    def scroll(dy: int) -> None:
+        """Scroll the wheel by *dy* notches (negative = down)."""
+        _user32.mouse_event(_MOUSEEVENTF_WHEEL, 0, 0, int(dy) * 120, 0)
+
+    def click_burst(
+        x: int, y: int, n: int = 1, interval: float = 0.0
+    ) -> None:
+        """
+        Teleport to *(x, y)* and left-click *n* times via ``SendInput``.
+
+        With *interval* 0 the whole burst goes out as one ``SendInput``
+        array.  A positive *interval* spaces individual down/up pairs
+        that far apart — zero-gap clicks at one coordinate can be
+        gesture-interpreted (double-tap) by an emulator's touch
+        translation, under-registering the burst.  Either way there is
+        no tween, no PAUSE, and no per-click framework overhead.
+        """
+        _user32.SetCursorPos(int(x), int(y))
+        if interval <= 0.0:
+            events = (_INPUT * (2 * n))()
+            for i in range(n):
+                events[2 * i].type = _INPUT_MOUSE
+                events[2 * i].mi.dwFlags = _MOUSEEVENTF_LEFTDOWN
+                events[2 * i + 1].type = _INPUT_MOUSE
+                events[2 * i + 1].mi.dwFlags = _MOUSEEVENTF_LEFTUP
+            _user32.SendInput(
+                2 * n, ctypes.byref(events), ctypes.sizeof(_INPUT)
+            )
+            return
+        pair = (_INPUT * 2)()
+        pair[0].type = _INPUT_MOUSE
+        pair[0].mi.dwFlags = _MOUSEEVENTF_LEFTDOWN
+        pair[1].type = _INPUT_MOUSE
+        pair[1].mi.dwFlags = _MOUSEEVENTF_LEFTUP
+        for i in range(n):
+            if i:
+                time.sleep(interval)
+            _user32.SendInput(2, ctypes.byref(pair), ctypes.sizeof(_INPUT))
+
+else:
+
+    def move_to(x: int, y: int) -> None:
+        """Teleport the cursor to *(x, y)* (no tween, no PAUSE)."""
+        pyautogui.moveTo(x, y, _pause=False)
+
+    def scroll(dy: int) -> None:
+        """Scroll the wheel by *dy* notches (negative = down)."""
+        pyautogui.scroll(dy, _pause=False)
+
+    def click_burst(
+        x: int, y: int, n: int = 1, interval: float = 0.0
+    ) -> None:
+        """Teleport to *(x, y)* and left-click *n* times back to back."""
+        pyautogui.click(
+            x=x, y=y, clicks=n, interval=interval, _pause=False
+        )
@@ -7,10 +7,16 @@ Defines the schema of all configurable positions and detection templates,
 and handles loading / saving ``config.json``.
 """
 
+import copy
 import json
 import os
 from typing import Any, Dict
 
+try:
+    import orjson
+except ImportError:  # optional — stdlib json is the fallback
+    orjson = None
+
 CONFIG_FILE = "config.json"
 
 # ---------------------------------------------------------------------------
@@ -101,15 +107,40 @@ def default_config() -> Dict[str, Any]:
         "settings": {
             "troop_count": 40,
             "spell_count": 11,
+            # (left, top, width, height) of the upgrade popup, or None
+            # to search the full screen for the Wall entry.
+            "wall_search_region": None,
         },
     }
 
 
+# Parsed configs keyed by path, tagged with the file's mtime so edits
+# made outside the process (or by save_config) are still picked up.
+# Deep-copied on return — callers mutate their config freely.
+_LOAD_CACHE: Dict[str, Any] = {}
+
+
 def load_config(path: str = CONFIG_FILE) -> Dict[str, Any]:
-    """Load config from *path*, merged with defaults for any missing keys."""
+    """
+    Load config from *path*, merged with defaults for any missing keys.
+
+    Cached by file mtime — per-cycle callers (the wall-upgrade loop
+    reloads before every pass) cost one ``stat`` plus a deep copy, not
+    an open + JSON parse, until the file actually changes on disk.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    if mtime is not None:
+        cached = _LOAD_CACHE.get(path)
+        if cached is not None and cached[0] == mtime:
+            return copy.deepcopy(cached[1])
+
     config = default_config()
 
-    if os.path.isfile(path):
+    if mtime is not None:
         try:
             with open(path, "r") as fh:
                 saved = json.load(fh)
@@ -118,13 +149,41 @@ def load_config(path: str = CONFIG_FILE) -> Dict[str, Any]:
                     for key, val in saved[section].items():
                         if key in config[section]:
                             config[section][key] = val
+            _LOAD_CACHE[path] = (mtime, copy.deepcopy(config))
         except (json.JSONDecodeError, Exception) as exc:
             print(f"[WARN] Failed to load config: {exc}")
 
     return config
 
 
+# Serialized form of the last write per path — lets no-op saves skip disk.
+_LAST_SAVED: Dict[str, bytes] = {}
+
+
 def save_config(config: Dict[str, Any], path: str = CONFIG_FILE) -> None:
-    """Persist *config* to *path* as pretty-printed JSON."""
-    with open(path, "w") as fh:
-        json.dump(config, fh, indent=2)
+    """
+    Persist *config* to *path* as pretty-printed JSON.
+
+    The panel auto-saves after every capture, so identical back-to-back
+    saves are common — compare against the last written payload and skip
+    the disk write when nothing changed.  Writes go to a sibling temp
+    file and are atomically renamed into place, so a crash mid-save can
+    never leave a truncated config.json behind.  Serialization uses
+    orjson when installed (several times faster), stdlib json otherwise.
+    """
+    if orjson is not None:
+        data = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(config, indent=2).encode()
+    if _LAST_SAVED.get(path) == data:
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+    _LAST_SAVED[path] = data
+    # Prime the load cache so the next load_config skips the re-parse.
+    try:
+        _LOAD_CACHE[path] = (os.stat(path).st_mtime_ns, copy.deepcopy(config))
+    except OSError:
+        _LOAD_CACHE.pop(path, None)
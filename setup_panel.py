@@ -21,16 +21,18 @@ Usage
     python setup_panel.py
 """
 
+import collections
+import concurrent.futures
 import os
+import sys
 import threading
+import weakref
 import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Callable, Dict, Optional
 
 import cv2
-import numpy as np
-import pyautogui
 from PIL import Image, ImageGrab, ImageTk
 from pynput import keyboard as pynput_kb
 from pynput import mouse as pynput_mouse
@@ -42,6 +44,9 @@ from core.config import (
     load_config,
     save_config,
 )
+from core.clicker import fast_click
+from core.detector import load_template_gray
+from core.screen import grab_gray, grab_image
 from core.wall_detector import find_wall_on_screen
 
 # ---------------------------------------------------------------------------
@@ -52,6 +57,16 @@ _SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 _IMG_DIR = os.path.join(_SCRIPT_DIR, "img")
 _HOTKEY = pynput_kb.Key.f6
 
+# OpenCL T-API probe for the Test-tab matches (same pattern as
+# core.detector's bulk path — importing setup_panel alone must not
+# leave OpenCL disabled just because the detector probe ran first).
+try:
+    _OCL_OK = bool(cv2.ocl.haveOpenCL())
+    if _OCL_OK:
+        cv2.ocl.setUseOpenCL(True)
+except Exception:  # pragma: no cover - depends on local OpenCV build
+    _OCL_OK = False
+
 
 # ===========================================================================
 #  ScrollableFrame
@@ -113,11 +128,13 @@ class RegionSelector(tk.Toplevel):
         screenshot: Image.Image,
         on_complete: Callable[[Image.Image], None],
         on_cancel: Callable[[], None],
+        want_box: bool = False,
     ) -> None:
         super().__init__(master)
 
         self._on_complete = on_complete
         self._on_cancel = on_cancel
+        self._want_box = want_box  # pass (l, t, w, h) instead of a crop
         self._done = False
 
         self.overrideredirect(True)
@@ -158,21 +175,26 @@ class RegionSelector(tk.Toplevel):
         self._sx, self._sy = e.x, e.y
 
     def _drag(self, e: tk.Event) -> None:
-        if self._rect:
-            self._canvas.delete(self._rect)
-        self._rect = self._canvas.create_rectangle(
-            self._sx, self._sy, e.x, e.y,
-            outline="#ff3333", width=2, dash=(6, 3),
-        )
+        # Mutate the one rectangle in place — delete+recreate per motion
+        # event churns Tk item ids hundreds of times per drag.
+        if self._rect is None:
+            self._rect = self._canvas.create_rectangle(
+                self._sx, self._sy, e.x, e.y,
+                outline="#ff3333", width=2, dash=(6, 3),
+            )
+        else:
+            self._canvas.coords(self._rect, self._sx, self._sy, e.x, e.y)
 
     def _release(self, e: tk.Event) -> None:
-        x0, y0 = min(self._sx, e.x), min(self._sy, e.y)
-        x1, y1 = max(self._sx, e.x), max(self._sy, e.y)
+        x0, x1 = sorted((self._sx, e.x))
+        y0, y1 = sorted((self._sy, e.y))
         if (x1 - x0) > 10 and (y1 - y0) > 10:
-            cropped = self._screenshot.crop((x0, y0, x1, y1))
             self._done = True
             self.destroy()
-            self._on_complete(cropped)
+            if self._want_box:
+                self._on_complete((x0, y0, x1 - x0, y1 - y0))
+            else:
+                self._on_complete(self._screenshot.crop((x0, y0, x1, y1)))
         elif self._rect:
             self._canvas.delete(self._rect)
 
@@ -190,90 +212,222 @@ class RegionSelector(tk.Toplevel):
 class BotOverlay(tk.Toplevel):
     """Small draggable overlay that shows live bot stats."""
 
+    # Constant fragments interned once at class creation; the pump only
+    # stringifies the four integers and joins, with no format-spec
+    # interpretation at all.
+    _P1 = sys.intern("Attacks: ")
+    _P2 = sys.intern("/")
+    _P3 = sys.intern("  |  ✓50%: ")
+    _P4 = sys.intern("  |  Left: ")
+    _PAUSE_TEXT = ("", "⏸ PAUSED")  # indexed by bool
+
+    _instance: "Optional[BotOverlay]" = None
+
+    @classmethod
+    def get_or_create(
+        cls, master: tk.Tk, on_stop: Callable[[], None]
+    ) -> "BotOverlay":
+        """
+        Return the shared overlay, building its widget tree only once.
+
+        Start/stop cycles reuse the same Toplevel via withdraw /
+        deiconify instead of tearing down and recreating six widgets
+        per restart; only the Stop button's callback is rebound.
+        """
+        inst = cls._instance
+        if inst is None or not inst.winfo_exists():
+            inst = cls._instance = cls(master, on_stop)
+        else:
+            inst._set_on_stop(on_stop)
+        return inst
+
     def __init__(
         self,
         master: tk.Tk,
         on_stop: Callable[[], None],
     ) -> None:
-        super().__init__(master)
+        super().__init__(master, bg="#1a1a2e")
         self.overrideredirect(True)
-        self.attributes("-topmost", True)
-        self.attributes("-alpha", 0.88)
-        self.configure(bg="#1a1a2e")
+        # One batched wm attributes call instead of two round-trips.
+        self.wm_attributes("-topmost", True, "-alpha", 0.88)
 
         frm = tk.Frame(self, bg="#1a1a2e", padx=10, pady=5)
-        frm.pack()
 
-        self._stats_var = tk.StringVar(
-            value="Attacks: 0/0  |  \u271350%: 0  |  Left: 0"
+        # Themed widgets \u2014 the ttk engine caches element layouts, so the
+        # frequently-redrawn stats label repaints cheaper than a legacy
+        # tk.Label.  Styles are configured once per palette entry.
+        style = ttk.Style(self)
+        style.configure(
+            "OverlayPause.TLabel",
+            background="#1a1a2e",
+            foreground="#ffcc00",
+            font=("Consolas", 9, "bold"),
         )
-        tk.Label(
-            frm,
-            textvariable=self._stats_var,
-            fg="#00ff88",
-            bg="#1a1a2e",
+        style.configure(
+            "OverlayHint.TLabel",
+            background="#1a1a2e",
+            foreground="#666666",
+            font=("Segoe UI", 8),
+        )
+        style.configure(
+            "OverlayStop.TButton",
+            background="#cc3333",
+            foreground="white",
+            font=("Segoe UI", 9, "bold"),
+            relief="flat",
+            padding=(10, 2),
+        )
+        style.map("OverlayStop.TButton", background=[("active", "#ff4444")])
+
+        # Build the whole widget tree first, then pack everything in one
+        # pass \u2014 each pack on a mapped parent triggers an incremental
+        # relayout, so packing last runs a single layout computation.
+        # Labels are configured directly \u2014 nothing else reads these
+        # values, so the StringVar/globalsetvar indirection is skipped.
+        # The stats line lives on a fixed-size Canvas: itemconfigure on
+        # a text item repaints without entering the geometry manager,
+        # whereas Label.configure can trigger a relayout of every
+        # sibling whenever the text width changes.
+        self._cv = tk.Canvas(
+            frm, width=300, height=22, bg="#1a1a2e", highlightthickness=0
+        )
+        self._stats_item = self._cv.create_text(
+            0,
+            11,
+            anchor="w",
+            fill="#00ff88",
             font=("Consolas", 11, "bold"),
-        ).pack(side="left", padx=(0, 14))
-
-        self._pause_var = tk.StringVar(value="")
-        tk.Label(
-            frm,
-            textvariable=self._pause_var,
-            fg="#ffcc00",
-            bg="#1a1a2e",
-            font=("Consolas", 9, "bold"),
-        ).pack(side="left", padx=(0, 10))
-
-        tk.Button(
+            text=self._format_stats(0, 0, 0, 0),
+        )
+        self._pause_lbl = ttk.Label(frm, text="", style="OverlayPause.TLabel")
+        self._set_on_stop(on_stop)
+        self._stop_btn = ttk.Button(
             frm,
             text="\u25a0  Stop",
-            fg="white",
-            bg="#cc3333",
-            activebackground="#ff4444",
-            relief="flat",
-            font=("Segoe UI", 9, "bold"),
-            command=on_stop,
-            padx=10,
-        ).pack(side="left", padx=2)
-
-        tk.Label(
-            frm,
-            text="F6: Panel",
-            fg="#666666",
-            bg="#1a1a2e",
-            font=("Segoe UI", 8),
-        ).pack(side="left", padx=(10, 0))
+            style="OverlayStop.TButton",
+            command=self._invoke_stop,
+        )
+        hint_lbl = ttk.Label(frm, text="F6: Panel", style="OverlayHint.TLabel")
 
-        # Upper-left of screen
-        self.update_idletasks()
-        self.geometry(f"+{4}+{4}")
+        self._cv.pack(side="left", padx=(0, 14))
+        self._pause_lbl.pack(side="left", padx=(0, 10))
+        self._stop_btn.pack(side="left", padx=2)
+        hint_lbl.pack(side="left", padx=(10, 0))
+        frm.pack()
 
-        # Drag support
+        # Upper-left of screen.  Position is mirrored in Python ints so
+        # the drag path never has to query winfo_x/winfo_y from Tcl.
+        # A position-only geometry string needs no size information, so
+        # no update_idletasks (forced layout pass) is required first.
+        self._x = self._y = 4
+        self.geometry(f"+{self._x}+{self._y}")
+
+        # Drag support — motion events only record the target position;
+        # the frame clock below applies it (high-poll mice fire
+        # <B1-Motion> far faster than the window can usefully move).
+        # The motion handler is bound only for the duration of a drag so
+        # no Tcl event callback dispatches while the overlay just sits
+        # there.
+        self._frm = frm
         self._dx = self._dy = 0
+        self._motion_id: Optional[str] = None
         frm.bind("<ButtonPress-1>", self._start_drag)
-        frm.bind("<B1-Motion>", self._do_drag)
+        frm.bind("<ButtonRelease-1>", self._end_drag)
+
+        # All visual state funnels through one ~60 Hz frame clock:
+        # producers (bot thread, drag handler) only mutate _next — dict
+        # item writes are atomic, no Tcl entry — and _tick diffs _next
+        # against the last-applied _state, touching Tcl only for fields
+        # that actually changed.  This bounds redraw work to the frame
+        # rate regardless of bot tick rate or mouse poll rate.
+        self._state = {"stats": (0, 0, 0, 0), "pause": False, "geom": None}
+        self._next = dict(self._state)
+        # While hidden (F6 panel toggle) the clock applies nothing and
+        # pays no Tcl cost; deiconify picks up the newest values.
+        self._visible = True
+        self.after(16, self._tick)
 
     # ------------------------------------------------------------------
 
+    @classmethod
+    def _format_stats(
+        cls, done: int, total: int, successful: int, remaining: int
+    ) -> str:
+        return "".join((
+            cls._P1, str(done), cls._P2, str(total),
+            cls._P3, str(successful), cls._P4, str(remaining),
+        ))
+
+    def _set_on_stop(self, on_stop: Callable[[], None]) -> None:
+        # Bound methods go through a WeakMethod so the long-lived
+        # singleton never pins the owning panel (and its closures) in
+        # memory; plain callables are kept as-is.
+        if hasattr(on_stop, "__self__"):
+            self._on_stop_ref = weakref.WeakMethod(on_stop)
+        else:
+            self._on_stop_ref = lambda cb=on_stop: cb
+
+    def _invoke_stop(self) -> None:
+        cb = self._on_stop_ref()
+        if cb is not None:
+            cb()
+
+    def withdraw(self) -> None:
+        self._visible = False
+        super().withdraw()
+
+    def deiconify(self) -> None:
+        self._visible = True
+        super().deiconify()
+
     def _start_drag(self, e: tk.Event) -> None:
         self._dx, self._dy = e.x, e.y
+        if self._motion_id is None:
+            self._motion_id = self._frm.bind(
+                "<B1-Motion>", self._do_drag, add="+"
+            )
+
+    def _end_drag(self, _e: tk.Event) -> None:
+        if self._motion_id is not None:
+            self._frm.unbind("<B1-Motion>", self._motion_id)
+            self._motion_id = None
 
     def _do_drag(self, e: tk.Event) -> None:
-        self.geometry(
-            f"+{self.winfo_x() + e.x - self._dx}"
-            f"+{self.winfo_y() + e.y - self._dy}"
+        self._next["geom"] = (
+            self._x + e.x - self._dx,
+            self._y + e.y - self._dy,
         )
 
     def update_stats(
         self, done: int, total: int, successful: int, remaining: int
     ) -> None:
-        self._stats_var.set(
-            f"Attacks: {done}/{total}  |  \u271350%: {successful}"
-            f"  |  Left: {remaining}"
-        )
+        self._next["stats"] = (done, total, successful, remaining)
 
     def set_paused(self, paused: bool) -> None:
-        self._pause_var.set("\u23f8 PAUSED" if paused else "")
+        self._next["pause"] = bool(paused)
+
+    def _tick(self) -> None:
+        """Frame clock — diff pending state and apply changes (~60 Hz)."""
+        if not self.winfo_exists():
+            return  # overlay destroyed — stop rescheduling
+        state, nxt = self._state, self._next
+        geom = nxt["geom"]
+        if geom is not None and geom != state["geom"]:
+            state["geom"] = geom
+            self._x, self._y = geom
+            self.geometry(f"+{geom[0]}+{geom[1]}")
+        if self._visible:
+            stats = nxt["stats"]
+            if stats != state["stats"]:
+                state["stats"] = stats
+                self._cv.itemconfigure(
+                    self._stats_item, text=self._format_stats(*stats)
+                )
+            pause = nxt["pause"]
+            if pause != state["pause"]:
+                state["pause"] = pause
+                self._pause_lbl.configure(text=self._PAUSE_TEXT[pause])
+        self.after(16, self._tick)
 
 
 # ===========================================================================
@@ -298,6 +452,11 @@ class SetupPanel:
         self.config = load_config()
         os.makedirs(_IMG_DIR, exist_ok=True)
 
+        # Filenames known to exist in img/ — scanned once here and kept
+        # in sync as templates are captured/pasted, so label refreshes
+        # never stat the directory (which may sit on slow storage).
+        self._present_tmpls: set = self._present_templates()
+
         # UI references ------------------------------------------------
         self._pos_labels: Dict[str, ttk.Label] = {}
         self._tmpl_labels: Dict[str, ttk.Label] = {}
@@ -306,13 +465,49 @@ class SetupPanel:
         # Status -------------------------------------------------------
         self._status_var = tk.StringVar(value="Ready")
         self._capturing = False
+        self._save_job: Optional[str] = None  # pending debounced save
+
+        # One long-lived worker for the match tests — cv2 releases the
+        # GIL, so matching runs truly parallel to the GUI, and reusing
+        # the thread avoids a spawn per Test press.
+        self._match_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1
+        )
+
+        # Log lines queue up (bot thread produces bursts) and drain in
+        # one Text transaction per idle cycle.  Bounded: if a runaway
+        # burst outpaces the Tk thread, the oldest pending lines are
+        # dropped rather than growing the backlog without limit (the
+        # widget itself is trimmed to 2000 lines anyway).
+        self._log_queue: collections.deque = collections.deque(maxlen=1000)
+        self._log_flush_scheduled = False
+        self._log_lock = threading.Lock()
+
+        # One persistent mouse listener — the OS hook is installed once
+        # here instead of per Set press (each Listener spawn paid
+        # SetWindowsHookEx latency and left a short-lived thread).
+        # Clicks only do anything while a capture key is armed.
+        self._pending_capture_key: Optional[str] = None
+        self._click_listener = pynput_mouse.Listener(
+            on_click=self._global_on_click
+        )
+        self._click_listener.daemon = True
+        self._click_listener.start()
 
         # Bot state ----------------------------------------------------
+        # The bot loop gets its own single-worker executor (same
+        # pattern as _match_pool): the worker thread is created once
+        # and reused across Start presses, and the future's done
+        # callback is the single completion signal.
         self._bot_running = False
-        self._bot_thread: Optional[threading.Thread] = None
+        self._bot_exec = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="botloop"
+        )
+        self._bot_future: Optional[concurrent.futures.Future] = None
         self._bot_stop = threading.Event()
         self._bot_pause = threading.Event()
         self._overlay: Optional[BotOverlay] = None
+        self._last_overlay_tuple: Optional[tuple] = None
         self._panel_visible = True
 
         # Bot settings -------------------------------------------------
@@ -321,6 +516,14 @@ class SetupPanel:
         self._spell_count = tk.IntVar(value=self.config.get("settings", {}).get("spell_count", 11))
         self._wall_enabled = tk.BooleanVar(value=False)
         self._wall_every = tk.IntVar(value=5)
+        # Each Tk variable is mirrored to a plain attribute on write,
+        # so nothing outside the Tk thread ever crosses into the Tcl
+        # interpreter to read a setting.
+        self._mirror_var(self._total_attacks, "_total_attacks_val")
+        self._mirror_var(self._troop_count, "_troop_count_val")
+        self._mirror_var(self._spell_count, "_spell_count_val")
+        self._mirror_var(self._wall_enabled, "_wall_enabled_val")
+        self._mirror_var(self._wall_every, "_wall_every_val")
         self._attacks_done = 0
         self._attacks_ok = 0  # 50 %+ destruction
 
@@ -328,11 +531,49 @@ class SetupPanel:
         self._build_ui()
         self._start_hotkey_listener()
 
-        # Position near top-right
-        self.root.update_idletasks()
-        sw = self.root.winfo_screenwidth()
-        w = self.root.winfo_width()
-        self.root.geometry(f"+{sw - w - 20}+{30}")
+        # Flattened (key, label) rows — _refresh_all walks these
+        # instead of re-iterating the nested schema dicts on every
+        # save/reload/reset.
+        self._pos_items = tuple(
+            (key, self._pos_labels[key])
+            for group in POSITION_SCHEMA.values()
+            for key in group
+            if key in self._pos_labels
+        )
+        self._tmpl_items = tuple(
+            (key, self._tmpl_labels[key])
+            for group in TEMPLATE_SCHEMA.values()
+            for key in group
+            if key in self._tmpl_labels
+        )
+
+        # Position near top-right.  reqwidth is what the widgets have
+        # already asked for, so no update_idletasks round is needed to
+        # realize the window first; the screen width is cached for any
+        # later repositioning.
+        self._screen_w = self.root.winfo_screenwidth()
+        w = self.root.winfo_reqwidth()
+        self.root.geometry(f"+{self._screen_w - w - 20}+{30}")
+
+    def _mirror_var(self, var, attr: str) -> None:
+        """
+        Mirror a Tk variable to a plain attribute *attr* on every write.
+
+        Tk variables are not thread-safe — a ``.get()`` from the bot
+        thread would cross the Tcl interpreter lock.  The mirror is a
+        plain Python attribute, readable from any thread.  A half-typed
+        spinbox raises ``TclError`` on read; the mirror then keeps its
+        last good value.
+        """
+        setattr(self, attr, var.get())
+
+        def _sync(*_args) -> None:
+            try:
+                setattr(self, attr, var.get())
+            except tk.TclError:
+                pass  # mid-edit value (e.g. empty spinbox) — keep last
+
+        var.trace_add("write", _sync)
 
     # ==================================================================
     #  UI construction
@@ -595,6 +836,10 @@ class SetupPanel:
             det, text="Run Test", command=self._run_detection_test
         ).grid(row=0, column=2, padx=6)
 
+        ttk.Button(
+            det, text="Test All", command=self._run_detection_test_all
+        ).grid(row=0, column=3, padx=2)
+
         self._test_det_result = tk.StringVar(value="\u2014")
         ttk.Label(
             det, textvariable=self._test_det_result, wraplength=340
@@ -655,6 +900,20 @@ class SetupPanel:
             command=self._run_wall_template_test,
         ).grid(row=1, column=0, sticky="w", pady=(6, 0))
 
+        # Optional search ROI — restricting the match to the upgrade
+        # popup shrinks correlation cost with the region's pixel count.
+        ttk.Button(
+            wall, text="Set Search Region",
+            command=self._start_wall_region_capture,
+        ).grid(row=1, column=1, sticky="w", padx=6, pady=(6, 0))
+
+        self._wall_region_var = tk.StringVar(
+            value=self._wall_region_display()
+        )
+        ttk.Label(
+            wall, textvariable=self._wall_region_var, foreground="gray",
+        ).grid(row=1, column=2, sticky="w", pady=(6, 0))
+
         self._test_wall_result = tk.StringVar(value="\u2014")
         ttk.Label(
             wall, textvariable=self._test_wall_result, wraplength=360,
@@ -678,12 +937,22 @@ class SetupPanel:
             return f"({pos[0]}, {pos[1]})", "#006600"
         return "\u2717 not set", "#cc0000"
 
-    @staticmethod
-    def _tmpl_display(tmpl) -> tuple:
-        if tmpl and os.path.isfile(os.path.join(_IMG_DIR, tmpl)):
+    def _tmpl_display(self, tmpl) -> tuple:
+        # Membership in the scandir-built set \u2014 repaints and tab
+        # switches never pay a per-row stat syscall; capture and paste
+        # writers add to the set, Reload re-scans it.
+        if tmpl and tmpl in self._present_tmpls:
             return f"\u2713 {tmpl}", "#006600"
         return "\u2717 not set", "#cc0000"
 
+    @staticmethod
+    def _present_templates() -> set:
+        """Filenames currently in ``img/`` (empty set if unreadable)."""
+        try:
+            return {e.name for e in os.scandir(_IMG_DIR) if e.is_file()}
+        except OSError:
+            return set()
+
     # ==================================================================
     #  Position capture  (click-to-set)
     # ==================================================================
@@ -697,12 +966,16 @@ class SetupPanel:
         self.root.after(400, self._listen_click, key)
 
     def _listen_click(self, key: str) -> None:
-        def on_click(x, y, button, pressed):
-            if pressed and button == pynput_mouse.Button.left:
-                self.root.after(0, self._finish_capture, key, x, y)
-                return False
+        # Arm the persistent listener rather than spawning a new hook.
+        self._pending_capture_key = key
 
-        pynput_mouse.Listener(on_click=on_click).start()
+    def _global_on_click(self, x, y, button, pressed) -> None:
+        key = self._pending_capture_key
+        if key is None:
+            return
+        if pressed and button == pynput_mouse.Button.left:
+            self._pending_capture_key = None
+            self.root.after(0, self._finish_capture, key, int(x), int(y))
 
     def _finish_capture(self, key: str, x: int, y: int) -> None:
         self.config["positions"][key] = [x, y]
@@ -725,16 +998,20 @@ class SetupPanel:
         self._capturing = True
         self._status_var.set("Taking screenshot...")
         self.root.withdraw()
-        self.root.update()
+        self.root.update_idletasks()
         self.root.after(400, self._do_region_capture, key)
 
     def _do_region_capture(self, key: str) -> None:
-        screenshot = pyautogui.screenshot()
+        # Raw mss grab wrapped by Image.frombuffer — skips pyautogui's
+        # PIL decode round-trip, which dominates capture-UX latency on
+        # high-DPI screens.
+        screenshot = grab_image()
 
         def on_complete(cropped: Image.Image) -> None:
             filename = f"{key}.png"
             cropped.save(os.path.join(_IMG_DIR, filename))
             self.config["templates"][key] = filename
+            self._present_tmpls.add(filename)
             lbl = self._tmpl_labels.get(key)
             if lbl:
                 lbl.config(text=f"\u2713 {filename}", foreground="#006600")
@@ -770,6 +1047,7 @@ class SetupPanel:
         filename = f"{key}.png"
         img.save(os.path.join(_IMG_DIR, filename))
         self.config["templates"][key] = filename
+        self._present_tmpls.add(filename)
 
         lbl = self._tmpl_labels.get(key)
         if lbl:
@@ -794,7 +1072,7 @@ class SetupPanel:
 
         self._status_var.set(f"Testing {key}...")
         self.root.attributes("-alpha", self._CAPTURE_ALPHA)
-        self.root.update()
+        self.root.update_idletasks()
         self.root.after(400, self._do_match_test, key, fpath, "status")
 
     # ==================================================================
@@ -821,49 +1099,165 @@ class SetupPanel:
 
         self._test_det_result.set("Scanning...")
         self.root.attributes("-alpha", self._CAPTURE_ALPHA)
-        self.root.update()
+        self.root.update_idletasks()
         self.root.after(400, self._do_match_test, key, fpath, "test_tab")
 
+    def _run_detection_test_all(self) -> None:
+        """Match every captured template against one screenshot."""
+        self._test_det_result.set("Scanning all templates...")
+        self.root.attributes("-alpha", self._CAPTURE_ALPHA)
+        self.root.update_idletasks()
+        self.root.after(400, self._do_match_test_all)
+
     # ------------------------------------------------------------------
 
-    def _do_match_test(self, key: str, fpath: str, target: str) -> None:
+    @staticmethod
+    def _match_one(gray, key: str, fpath: str, gray_half=None) -> str:
         """
-        Run cv2.matchTemplate and report result.
-
-        *target*: ``"status"`` writes to status bar,
-                  ``"test_tab"`` writes to the Test tab result label.
+        Match one template against an already-grabbed frame.
+
+        Templates come from the detector's mtime-keyed cache (decoded
+        grayscale plus pyramid levels), so repeated Test presses skip
+        the PNG decode entirely.  Large templates match coarse-to-fine:
+        a half-resolution pass locates the candidate (~4x fewer
+        multiply-accumulates), then only a small ROI is rescored at
+        full resolution.  Callers matching several templates against
+        the same frame should pass a shared *gray_half*.
         """
-        try:
-            ss = pyautogui.screenshot()
-            gray = cv2.cvtColor(np.array(ss), cv2.COLOR_RGB2GRAY)
-            tmpl = cv2.imread(fpath, cv2.IMREAD_GRAYSCALE)
-
-            if tmpl is None:
-                msg = f"\u2717  Cannot load template: {key}"
-            else:
+        global _OCL_OK
+
+        tmpl = load_template_gray(fpath)
+        if tmpl is None:
+            return f"\u2717  Cannot load template: {key}"
+        th, tw = tmpl.shape[:2]
+
+        if _OCL_OK:
+            # T-API offload: wrapping both operands in UMat makes
+            # matchTemplate dispatch to OpenCL (iGPU included), which
+            # beats the CPU pyramid below at full resolution \u2014 no
+            # half-res miss risk, one correlation instead of two.
+            try:
                 res = cv2.matchTemplate(
-                    gray, tmpl, cv2.TM_CCOEFF_NORMED
+                    cv2.UMat(gray), cv2.UMat(tmpl), cv2.TM_CCOEFF_NORMED
                 )
                 _, mx, _, loc = cv2.minMaxLoc(res)
                 conf = round(mx * 100, 1)
-
                 if mx >= 0.8:
-                    cx = loc[0] + tmpl.shape[1] // 2
-                    cy = loc[1] + tmpl.shape[0] // 2
-                    msg = (
+                    cx = loc[0] + tw // 2
+                    cy = loc[1] + th // 2
+                    return (
                         f"\u2713  {key}: FOUND at ({cx}, {cy}) "
                         f"\u2014 {conf}% confidence"
                     )
-                else:
-                    msg = (
-                        f"\u2717  {key}: NOT FOUND "
-                        f"\u2014 best match {conf}%"
-                    )
-        except Exception as exc:
-            msg = f"\u2717  Test error: {exc}"
+                return (
+                    f"\u2717  {key}: NOT FOUND \u2014 best match {conf}%"
+                )
+            except cv2.error:
+                _OCL_OK = False  # broken OpenCL runtime \u2014 stay on CPU
 
-        self.root.attributes("-alpha", self._WINDOW_ALPHA)
+        if min(th, tw) >= 24:
+            if gray_half is None:
+                gray_half = cv2.resize(
+                    gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA
+                )
+            tmpl_half = cv2.resize(
+                tmpl, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA
+            )
+            res = cv2.matchTemplate(
+                gray_half, tmpl_half, cv2.TM_CCOEFF_NORMED
+            )
+            _, mx, _, loc_half = cv2.minMaxLoc(res)
+            if mx < 0.5:
+                # Clear miss at half resolution \u2014 skip the refinement.
+                return (
+                    f"\u2717  {key}: NOT FOUND \u2014 best match "
+                    f"{round(mx * 100, 1)}%"
+                )
+            x0 = max(0, 2 * loc_half[0] - 8)
+            y0 = max(0, 2 * loc_half[1] - 8)
+            roi = gray[
+                y0:2 * loc_half[1] + th + 8,
+                x0:2 * loc_half[0] + tw + 8,
+            ]
+            res = cv2.matchTemplate(roi, tmpl, cv2.TM_CCOEFF_NORMED)
+            _, mx, _, loc_roi = cv2.minMaxLoc(res)
+            loc = (x0 + loc_roi[0], y0 + loc_roi[1])
+        else:
+            # Tiny template \u2014 halving would distort it; match full-res.
+            res = cv2.matchTemplate(gray, tmpl, cv2.TM_CCOEFF_NORMED)
+            _, mx, _, loc = cv2.minMaxLoc(res)
+
+        conf = round(mx * 100, 1)
+        if mx >= 0.8:
+            cx = loc[0] + tw // 2
+            cy = loc[1] + th // 2
+            return (
+                f"\u2713  {key}: FOUND at ({cx}, {cy}) "
+                f"\u2014 {conf}% confidence"
+            )
+        return f"\u2717  {key}: NOT FOUND \u2014 best match {conf}%"
+
+    def _do_match_test(self, key: str, fpath: str, target: str) -> None:
+        """
+        Run cv2.matchTemplate on a worker thread and report the result.
+
+        The correlation can take tens of ms on large screens; keeping
+        it off the Tk thread leaves the event loop drained.  *target*:
+        ``"status"`` writes to status bar, ``"test_tab"`` to the Test
+        tab result label.
+        """
+        def worker() -> str:
+            try:
+                # Same mss fast path as the bot loop — straight to
+                # gray, no PIL round-trip or extra full-frame copies.
+                gray = grab_gray()
+                return self._match_one(gray, key, fpath)
+            except Exception as exc:
+                return f"\u2717  Test error: {exc}"
+
+        fut = self._match_pool.submit(worker)
+        fut.add_done_callback(
+            lambda f: self.root.after(
+                0, self._finish_match_test, f.result(), target
+            )
+        )
 
+    def _do_match_test_all(self) -> None:
+        """One grab, every template — skips N-1 screenshots/converts."""
+        def worker() -> str:
+            lines = []
+            try:
+                gray = grab_gray()
+                gray_half = cv2.resize(
+                    gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA
+                )
+                for grp in TEMPLATE_SCHEMA.values():
+                    for key in grp:
+                        tmpl_file = self.config["templates"].get(key)
+                        if not tmpl_file:
+                            lines.append(f"\u2014  {key}: no template set")
+                            continue
+                        fpath = os.path.join(_IMG_DIR, tmpl_file)
+                        if not os.path.isfile(fpath):
+                            lines.append(f"\u2717  {key}: file missing")
+                            continue
+                        lines.append(
+                            self._match_one(gray, key, fpath, gray_half)
+                        )
+            except Exception as exc:
+                lines.append(f"\u2717  Test error: {exc}")
+            return "\n".join(lines)
+
+        fut = self._match_pool.submit(worker)
+        fut.add_done_callback(
+            lambda f: self.root.after(
+                0, self._finish_match_test, f.result(), "test_tab"
+            )
+        )
+
+    def _finish_match_test(self, msg: str, target: str) -> None:
+        """Back on the Tk thread — restore alpha and show the result."""
+        self.root.attributes("-alpha", self._WINDOW_ALPHA)
         if target == "status":
             self._status_var.set(msg)
         else:
@@ -889,12 +1283,15 @@ class SetupPanel:
         x, y = pos
         self._test_click_result.set(f"Clicking ({x}, {y}) in 2 seconds...")
         self.root.attributes("-alpha", self._CAPTURE_ALPHA)
-        self.root.update()
+        self.root.update_idletasks()
         self.root.after(2000, self._do_click_test, key, x, y)
 
     def _do_click_test(self, key: str, x: int, y: int) -> None:
         try:
-            pyautogui.click(x, y)
+            # Same raw-input path the bot uses — the test should click
+            # exactly what an attack run would, without pyautogui's
+            # built-in PAUSE.
+            fast_click(x, y)
             self.root.attributes("-alpha", self._WINDOW_ALPHA)
             self._test_click_result.set(
                 f"\u2713 Clicked {key} at ({x}, {y})"
@@ -910,7 +1307,8 @@ class SetupPanel:
     def _run_wall_template_test(self) -> None:
         """Search the screen for the 'Wall' template image."""
         tpl = self.config["templates"].get("wall_text")
-        if not tpl or not os.path.isfile(tpl):
+        fpath = os.path.join(_IMG_DIR, tpl) if tpl else ""
+        if not tpl or not os.path.isfile(fpath):
             self._test_wall_result.set(
                 "\u2717  No wall template captured. "
                 "Go to Detection tab \u2192 capture 'Wall Text' first."
@@ -919,8 +1317,8 @@ class SetupPanel:
 
         self._test_wall_result.set("Matching wall template...")
         self.root.attributes("-alpha", self._CAPTURE_ALPHA)
-        self.root.update()
-        self.root.after(400, lambda: self._do_wall_template_test(tpl))
+        self.root.update_idletasks()
+        self.root.after(400, lambda: self._do_wall_template_test(fpath))
 
     def _do_wall_template_test(self, tpl: str) -> None:
         try:
@@ -938,6 +1336,43 @@ class SetupPanel:
             self.root.attributes("-alpha", self._WINDOW_ALPHA)
             self._test_wall_result.set(f"\u2717  Detection error: {exc}")
 
+    # ==================================================================
+    #  Wall search region capture
+    # ==================================================================
+
+    def _wall_region_display(self) -> str:
+        region = self.config.get("settings", {}).get("wall_search_region")
+        if region and len(region) == 4:
+            return f"({region[0]}, {region[1]}) {region[2]}\u00d7{region[3]}"
+        return "full screen"
+
+    def _start_wall_region_capture(self) -> None:
+        """Drag-select the upgrade-popup rectangle to restrict matching."""
+        self.root.attributes("-alpha", 0.0)
+        self._status_var.set("Drag the upgrade popup region...")
+        self.root.update_idletasks()
+        self.root.after(400, self._do_wall_region_capture)
+
+    def _do_wall_region_capture(self) -> None:
+        screenshot = grab_image()
+
+        def on_complete(box) -> None:
+            self.root.attributes("-alpha", self._WINDOW_ALPHA)
+            self.config.setdefault("settings", {})[
+                "wall_search_region"
+            ] = list(box)
+            self._wall_region_var.set(self._wall_region_display())
+            self._status_var.set("Wall search region saved")
+            self._auto_save()
+
+        def on_cancel() -> None:
+            self.root.attributes("-alpha", self._WINDOW_ALPHA)
+            self._status_var.set("Region capture cancelled")
+
+        RegionSelector(
+            self.root, screenshot, on_complete, on_cancel, want_box=True
+        )
+
     # ==================================================================
     #  Bot control
     # ==================================================================
@@ -968,38 +1403,42 @@ class SetupPanel:
         self._stop_btn.config(state="normal")
 
         self._log_msg("Bot started")
-        self._log_msg(f"Target: {self._total_attacks.get()} attacks")
-        if self._wall_enabled.get():
+        self._log_msg(f"Target: {self._total_attacks_val} attacks")
+        if self._wall_enabled_val:
             self._log_msg(
-                f"Wall upgrade every {self._wall_every.get()} attacks"
+                f"Wall upgrade every {self._wall_every_val} attacks"
             )
 
+        # Snapshot the trace-maintained mirrors so one run keeps one
+        # consistent set of settings even if the spinboxes change
+        # mid-run; the bot thread reads only these plain attributes.
+        self._run_total = self._total_attacks_val
+        self._run_troops = self._troop_count_val
+        self._run_spells = self._spell_count_val
+        self._run_wall_enabled = self._wall_enabled_val
+        self._run_wall_every = self._wall_every_val
+
         # Switch to overlay
         self._show_overlay()
         self._panel_visible = False
         self.root.withdraw()
 
-        # Launch bot thread
-        self._bot_thread = threading.Thread(
-            target=self._bot_loop, daemon=True
+        # Launch bot loop on the reusable worker
+        self._bot_future = self._bot_exec.submit(self._bot_loop)
+        self._bot_future.add_done_callback(
+            lambda f: self.root.after(0, self._bot_finished)
         )
-        self._bot_thread.start()
-
-        # Periodic overlay refresh
-        self._tick_overlay()
 
     def _bot_loop(self) -> None:
         """Bot main loop — delegates to attack.py engine."""
-        total = self._total_attacks.get()
+        total = self._run_total
 
         try:
             # Save troop_count into config before passing it
             self.config.setdefault("settings", {})["troop_count"] = (
-                self._troop_count.get()
-            )
-            self.config["settings"]["spell_count"] = (
-                self._spell_count.get()
+                self._run_troops
             )
+            self.config["settings"]["spell_count"] = self._run_spells
             self._auto_save()
 
             from attack import run_attacks
@@ -1008,24 +1447,24 @@ class SetupPanel:
                 self._attacks_done = num
                 if got_fifty:
                     self._attacks_ok += 1
+                self._push_overlay_stats(total)
 
             run_attacks(
                 config=self.config,
                 total=total,
                 stop_event=self._bot_stop,
                 pause_event=self._bot_pause,
-                wall_enabled=self._wall_enabled.get(),
-                wall_every=self._wall_every.get(),
+                wall_enabled=self._run_wall_enabled,
+                wall_every=self._run_wall_every,
                 on_attack_done=_on_attack_done,
                 log=self._log_msg,
             )
 
         except Exception as exc:
+            # Completion itself is signalled by the future's done
+            # callback in _start_bot — only the error needs logging.
             self._log_msg(f"Bot error: {exc}")
 
-        finally:
-            self.root.after(0, self._bot_finished)
-
     def _stop_bot(self) -> None:
         if not self._bot_running:
             return
@@ -1053,28 +1492,36 @@ class SetupPanel:
     # ==================================================================
 
     def _show_overlay(self) -> None:
-        if self._overlay:
-            self._overlay.destroy()
-        self._overlay = BotOverlay(self.root, on_stop=self._stop_bot)
-        total = self._total_attacks.get()
+        self._overlay = BotOverlay.get_or_create(
+            self.root, on_stop=self._stop_bot
+        )
+        self._overlay.deiconify()
+        total = self._total_attacks_val
+        self._last_overlay_tuple = (0, total, 0, total)
         self._overlay.update_stats(0, total, 0, total)
 
     def _hide_overlay(self) -> None:
+        # Withdrawn, not destroyed — the singleton is reused next start.
         if self._overlay:
-            self._overlay.destroy()
-            self._overlay = None
+            self._overlay.withdraw()
 
-    def _tick_overlay(self) -> None:
-        """Periodically refresh overlay stats from main thread."""
-        if not self._bot_running:
-            return
-        total = self._total_attacks.get()
-        remaining = max(0, total - self._attacks_done)
-        if self._overlay:
-            self._overlay.update_stats(
-                self._attacks_done, total, self._attacks_ok, remaining
-            )
-        self.root.after(500, self._tick_overlay)
+    def _push_overlay_stats(self, total: int) -> None:
+        """
+        Push current counters to the overlay when they change.
+
+        Safe from the bot thread: ``update_stats`` is a plain dict
+        write, and the overlay's own frame clock coalesces repaints —
+        no 500 ms polling wakeup, no Tcl entry from here.
+        """
+        overlay = self._overlay
+        if overlay:
+            remaining = max(0, total - self._attacks_done)
+            cur = (self._attacks_done, total, self._attacks_ok, remaining)
+            # Dirty-tuple guard: identical pushes stop here, before even
+            # the overlay's own state diff sees them.
+            if cur != self._last_overlay_tuple:
+                self._last_overlay_tuple = cur
+                overlay.update_stats(*cur)
 
     # ==================================================================
     #  F6 hotkey  (toggle panel / overlay while bot is running)
@@ -1126,13 +1573,30 @@ class SetupPanel:
     # ==================================================================
 
     def _log_msg(self, msg: str) -> None:
-        """Schedule a log append on the tkinter main thread."""
-        self.root.after(0, self._append_log, msg)
-
-    def _append_log(self, msg: str) -> None:
-        ts = time.strftime("%H:%M:%S")
+        """Queue a log line; the batch lands in one Text transaction."""
+        line = f"[{time.strftime('%H:%M:%S')}] {msg}"
+        with self._log_lock:
+            self._log_queue.append(line)
+            if self._log_flush_scheduled:
+                return
+            self._log_flush_scheduled = True
+        self.root.after_idle(self._flush_log)
+
+    def _flush_log(self) -> None:
+        """Drain queued log lines with a single insert/see/config."""
+        with self._log_lock:
+            lines = list(self._log_queue)
+            self._log_queue.clear()
+            self._log_flush_scheduled = False
+        if not lines:
+            return
         self._log_text.config(state="normal")
-        self._log_text.insert("end", f"[{ts}] {msg}\n")
+        self._log_text.insert("end", "\n".join(lines) + "\n")
+        # Bound the widget — Text relayout cost grows with line count,
+        # and an overnight run would otherwise accumulate unbounded.
+        n = int(self._log_text.index("end-1c").split(".")[0])
+        if n > 2000:
+            self._log_text.delete("1.0", f"{n - 2000}.0")
         self._log_text.see("end")
         self._log_text.config(state="disabled")
 
@@ -1141,14 +1605,27 @@ class SetupPanel:
     # ==================================================================
 
     def _auto_save(self) -> None:
+        """Schedule a save 500 ms out, coalescing rapid-fire edits."""
+        if self._save_job is not None:
+            self.root.after_cancel(self._save_job)
+        self._save_job = self.root.after(500, self._flush_save)
+
+    def _flush_save(self) -> None:
+        self._save_job = None
         save_config(self.config)
 
     def _save(self) -> None:
+        # Explicit saves flush immediately (and drop any pending job).
+        if self._save_job is not None:
+            self.root.after_cancel(self._save_job)
+            self._save_job = None
         save_config(self.config)
         self._status_var.set("\u2713  Config saved")
 
     def _reload(self) -> None:
         self.config = load_config()
+        # Re-scan once — files may have changed outside the panel.
+        self._present_tmpls = self._present_templates()
         self._refresh_all()
         self._status_var.set("\u2713  Config reloaded")
 
@@ -1160,30 +1637,44 @@ class SetupPanel:
             self._status_var.set("\u2713  Config reset")
 
     def _refresh_all(self) -> None:
-        for group in POSITION_SCHEMA.values():
-            for key in group:
-                lbl = self._pos_labels.get(key)
-                if lbl:
-                    pos = self.config["positions"].get(key)
-                    txt, fg = self._pos_display(pos)
-                    lbl.config(text=txt, foreground=fg)
-
-        for group in TEMPLATE_SCHEMA.values():
-            for key in group:
-                lbl = self._tmpl_labels.get(key)
-                if lbl:
-                    tmpl = self.config["templates"].get(key)
-                    txt, fg = self._tmpl_display(tmpl)
-                    lbl.config(text=txt, foreground=fg)
+        """
+        Push current config into the existing row labels, in place.
+
+        Deliberately never destroys or rebuilds widgets: Reload/Reset
+        only retext ~30 labels via ``config``, so there is no ttk
+        re-theme, scrollbar re-layout, or flicker.
+        """
+        # The display text uniquely determines the colour, so comparing
+        # text alone is enough to skip a row.  A reload after one change
+        # then reconfigures one label, not every row (each config call
+        # is a Tk message plus a geometry recalc).
+        positions = self.config["positions"]
+        for key, lbl in self._pos_items:
+            txt, fg = self._pos_display(positions.get(key))
+            if lbl.cget("text") != txt:
+                lbl.config(text=txt, foreground=fg)
+
+        templates = self.config["templates"]
+        for key, lbl in self._tmpl_items:
+            txt, fg = self._tmpl_display(templates.get(key))
+            if lbl.cget("text") != txt:
+                lbl.config(text=txt, foreground=fg)
 
     # ==================================================================
     #  Shutdown
     # ==================================================================
 
     def _on_close(self) -> None:
+        # The executor's worker is non-daemon, so interpreter exit
+        # joins it.  Setting the stop event is what actually unblocks
+        # that join: run_attacks and every detector wait_for sleep on
+        # it, so the loop unwinds within one poll instead of riding
+        # out a 15–30 s template timeout.
         if self._bot_running:
             self._bot_stop.set()
             self._bot_pause.clear()
+        self._bot_exec.shutdown(wait=False)
+        self._match_pool.shutdown(wait=False)
         self._hide_overlay()
         self.root.destroy()
 
@@ -22,9 +22,11 @@ import os
 import time
 from typing import Any, Callable, Dict, Optional, Tuple
 
+from core._input_fast import click_burst
 from core.clicker import click, scroll_at
 from core.config import load_config
-from core.wall_detector import scroll_and_find_wall
+from core.screen import wait_until_stable
+from core.wall_detector import find_wall_on_screen, scroll_and_find_wall
 
 # Default template path (set via Setup Panel → Detection tab)
 _WALL_TEMPLATE = os.path.join("img", "wall_text.png")
@@ -34,9 +36,9 @@ _WALL_TEMPLATE = os.path.join("img", "wall_text.png")
 #  Helpers
 # ---------------------------------------------------------------------------
 
-def _pos(config: Dict[str, Any], key: str) -> Optional[Tuple[int, int]]:
-    """Return ``(x, y)`` from config positions or ``None``."""
-    val = config["positions"].get(key)
+def _pos(positions: Dict[str, Any], key: str) -> Optional[Tuple[int, int]]:
+    """Return ``(x, y)`` from a *positions* mapping or ``None``."""
+    val = positions.get(key)
     if val and isinstance(val, (list, tuple)) and len(val) == 2:
         return tuple(val)
     return None
@@ -47,11 +49,12 @@ def _open_upgrade_list_and_find_wall(
     scroll_pos: Tuple[int, int],
     max_scrolls: int,
     log: Callable,
+    region: Optional[Tuple[int, int, int, int]] = None,
 ) -> Optional[Tuple[int, int]]:
     """Click All Upgradable, scroll, and return Wall position or None."""
     log("Opening upgrade list...")
     click(*upgradable)
-    time.sleep(1.0)
+    wait_until_stable(region, timeout=1.0)
 
     if not os.path.isfile(_WALL_TEMPLATE):
         log(f"Wall template not found: {_WALL_TEMPLATE}")
@@ -64,6 +67,7 @@ def _open_upgrade_list_and_find_wall(
         scroll_x=scroll_pos[0],
         scroll_y=scroll_pos[1],
         max_scrolls=max_scrolls,
+        region=region,
     )
 
     if not wall_pos:
@@ -74,6 +78,49 @@ def _open_upgrade_list_and_find_wall(
     return wall_pos
 
 
+def _refind_wall_after_upgrade(
+    upgradable: Tuple[int, int],
+    cached_pos: Tuple[int, int],
+    scroll_pos: Tuple[int, int],
+    max_scrolls: int,
+    log: Callable,
+    region: Optional[Tuple[int, int, int, int]] = None,
+) -> Optional[Tuple[int, int]]:
+    """
+    Re-open the upgrade list and find Wall again, seeded by a prior pass.
+
+    After an upgrade the list usually re-opens at the same offset, so
+    one match inside a small box around *cached_pos* replaces the full
+    settle-then-drag-scroll search (up to *max_scrolls* screenshots and
+    drags).  Only a miss falls back to scrolling — from the already-open
+    list, without re-clicking All Upgradable.
+
+    This is deliberately synchronous: prefetching the position from a
+    background thread would mean clicking mid-pass, and there is only
+    one cursor — the cached coordinate carries all the reusable state
+    between passes.
+    """
+    log("Re-opening upgrade list...")
+    click(*upgradable)
+    wait_until_stable(region, timeout=1.0)
+
+    x, y = cached_pos
+    verify = (max(0, x - 150), max(0, y - 60), 300, 120)
+    pos = find_wall_on_screen(_WALL_TEMPLATE, region=verify)
+    if pos:
+        log(f"Wall re-found at cached position ({pos[0]}, {pos[1]})")
+        return pos
+
+    log("Cached Wall position stale — scrolling to re-find...")
+    return scroll_and_find_wall(
+        template_path=_WALL_TEMPLATE,
+        scroll_x=scroll_pos[0],
+        scroll_y=scroll_pos[1],
+        max_scrolls=max_scrolls,
+        region=region,
+    )
+
+
 def _do_single_upgrade(
     wall_pos: Tuple[int, int],
     select_multi: Optional[Tuple[int, int]],
@@ -86,24 +133,26 @@ def _do_single_upgrade(
     # Click on the Wall entry
     log("Clicking Wall entry...")
     click(*wall_pos)
-    time.sleep(0.8)
+    wait_until_stable(timeout=0.8)
 
-    # Select Multiple Walls (click 3 times to queue more upgrades)
+    # Select Multiple Walls (click 3 times to queue more upgrades).
+    # Raw-input clicks with a short gap: the gap is game pacing — the
+    # emulator's touch translation gesture-interprets zero-spaced
+    # clicks (double-tap) and under-registers the multi-select.
     if select_multi:
         log("Clicking Select Multiple (×3)...")
-        for _ in range(3):
-            click(*select_multi)
-            time.sleep(0.3)
+        click_burst(*select_multi, n=3, interval=0.08)
+        wait_until_stable(timeout=0.5)
 
     # Choose resource
     log(f"Upgrading with {resource_name}...")
     click(*resource_btn)
-    time.sleep(0.5)
+    wait_until_stable(timeout=0.5)
 
     # Confirm
     log("Confirming upgrade...")
     click(*ok_btn)
-    time.sleep(0.8)
+    wait_until_stable(timeout=0.8)
 
     log(f"Wall upgrade with {resource_name} complete.")
     return True
@@ -147,12 +196,13 @@ def upgrade_walls_full_cycle(
         config = load_config()
 
     # ── Validate required positions ───────────────────────────────────
-    upgradable  = _pos(config, "wall_upgradable")
-    scroll_pos  = _pos(config, "wall_scroll_pos")
-    select_multi = _pos(config, "wall_select_multi")
-    gold_btn    = _pos(config, "wall_gold")
-    elixir_btn  = _pos(config, "wall_elixir")
-    ok_btn      = _pos(config, "wall_ok")
+    positions = config["positions"]  # bind once for the six lookups
+    upgradable  = _pos(positions, "wall_upgradable")
+    scroll_pos  = _pos(positions, "wall_scroll_pos")
+    select_multi = _pos(positions, "wall_select_multi")
+    gold_btn    = _pos(positions, "wall_gold")
+    elixir_btn  = _pos(positions, "wall_elixir")
+    ok_btn      = _pos(positions, "wall_ok")
 
     missing = []
     if not upgradable:   missing.append("wall_upgradable")
@@ -165,27 +215,39 @@ def upgrade_walls_full_cycle(
         log(f"Missing positions: {', '.join(missing)}")
         return False
 
+    region = config.get("settings", {}).get("wall_search_region")
+
     any_success = False
 
     # ── Pass 1 — Upgrade with GOLD ────────────────────────────────────
     log("═══ Pass 1: Upgrade with Gold ═══")
     wall_pos = _open_upgrade_list_and_find_wall(
-        upgradable, scroll_pos, max_scrolls, log,
+        upgradable, scroll_pos, max_scrolls, log, region=region,
     )
     if wall_pos:
         _do_single_upgrade(
             wall_pos, select_multi, gold_btn, ok_btn, "Gold", log,
         )
         any_success = True
-        time.sleep(1.0)
+        # No extra settle here — _do_single_upgrade already waited out
+        # the confirm animation, and the Elixir pass opens with its own
+        # stability wait.
     else:
         log("Skipping Gold upgrade — Wall not found.")
 
     # ── Pass 2 — Upgrade with ELIXIR ─────────────────────────────────
     log("═══ Pass 2: Upgrade with Elixir ═══")
-    wall_pos = _open_upgrade_list_and_find_wall(
-        upgradable, scroll_pos, max_scrolls, log,
-    )
+    if wall_pos:
+        # Gold pass located the row — verify the cached coordinate
+        # instead of repeating the whole scroll search.
+        wall_pos = _refind_wall_after_upgrade(
+            upgradable, wall_pos, scroll_pos, max_scrolls, log,
+            region=region,
+        )
+    else:
+        wall_pos = _open_upgrade_list_and_find_wall(
+            upgradable, scroll_pos, max_scrolls, log, region=region,
+        )
     if wall_pos:
         _do_single_upgrade(
             wall_pos, select_multi, elixir_btn, ok_btn, "Elixir", log,
@@ -224,11 +286,12 @@ def upgrade_walls(
     if config is None:
         config = load_config()
 
-    upgradable  = _pos(config, "wall_upgradable")
-    scroll_pos  = _pos(config, "wall_scroll_pos")
-    select_multi = _pos(config, "wall_select_multi")
-    resource_btn = _pos(config, f"wall_{resource}")
-    ok_btn       = _pos(config, "wall_ok")
+    positions = config["positions"]
+    upgradable  = _pos(positions, "wall_upgradable")
+    scroll_pos  = _pos(positions, "wall_scroll_pos")
+    select_multi = _pos(positions, "wall_select_multi")
+    resource_btn = _pos(positions, f"wall_{resource}")
+    ok_btn       = _pos(positions, "wall_ok")
 
     missing = []
     if not upgradable:   missing.append("wall_upgradable")
@@ -242,6 +305,7 @@ def upgrade_walls(
 
     wall_pos = _open_upgrade_list_and_find_wall(
         upgradable, scroll_pos, max_scrolls, log,
+        region=config.get("settings", {}).get("wall_search_region"),
     )
     if not wall_pos:
         return False
@@ -256,12 +320,44 @@ def upgrade_walls(
 # ---------------------------------------------------------------------------
 
 def main() -> None:
-    """Run a full wall upgrade cycle (Gold + Elixir)."""
-    print("Starting full wall upgrade cycle (Gold + Elixir)...")
-    print("You have 3 seconds to switch to the game window.\n")
-    time.sleep(3)
+    """Run a wall upgrade cycle, configurable from the command line."""
+    import argparse  # CLI-only — keep it off the library import path
+
+    parser = argparse.ArgumentParser(
+        description="Standalone CoC wall upgrade cycle."
+    )
+    parser.add_argument(
+        "--resource",
+        choices=("gold", "elixir", "both"),
+        default="both",
+        help="which resource to upgrade with (default: both)",
+    )
+    parser.add_argument(
+        "--max-scrolls",
+        type=int,
+        default=10,
+        help="scroll steps while searching for Wall (default: 10)",
+    )
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=3.0,
+        help="seconds to wait before starting (default: 3)",
+    )
+    args = parser.parse_args()
+
+    if args.delay > 0:
+        print(f"Starting wall upgrade ({args.resource})...")
+        print(f"You have {args.delay:g} seconds to switch to the game window.\n")
+        time.sleep(args.delay)
+
+    if args.resource == "both":
+        success = upgrade_walls_full_cycle(max_scrolls=args.max_scrolls)
+    else:
+        success = upgrade_walls(
+            resource=args.resource, max_scrolls=args.max_scrolls
+        )
 
-    success = upgrade_walls_full_cycle()
     if success:
         print("\nDone!")
     else: